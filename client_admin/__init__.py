@@ -18,3 +18,5 @@ administration interface, including a dashboard, a customizable menu bar, and
 
 """
 VERSION = '1.1.8'
+
+default_app_config = 'client_admin.apps.ClientAdminConfig'
@@ -13,8 +13,9 @@
 # limitations under the License.
 
 # # Client Admin admin classes
+from client_admin.changelist import ClientChangeList
 from client_admin.views import generic_lookup, get_generic_rel_list
-from client_admin.widgets import ThumbnailImageWidget, AdminURLFieldWidget, UnicodeForeignKeyRawIdWidget
+from client_admin.widgets import ThumbnailImageWidget, AdminURLFieldWidget, UnicodeForeignKeyRawIdWidget, get_label_collector
 
 import re
 
@@ -24,20 +25,23 @@ from django.contrib import admin
 from django.contrib.admin import helpers
 from django.contrib.admin.options import get_ul_class, IS_POPUP_VAR
 from django.contrib.admin.templatetags.admin_static import static
-from django.contrib.admin.util import unquote
+from django.contrib.admin.util import quote, unquote
 from django.contrib.admin.widgets import AdminRadioSelect
 from django.contrib.contenttypes import generic
 from django.core.urlresolvers import reverse
 from django.core.exceptions import PermissionDenied
 from django.db import transaction
 from django.db.models import ImageField, ManyToManyField, FieldDoesNotExist, URLField
-from django.forms import Form
+from django.db.models.constants import LOOKUP_SEP
+from django.forms import Form, Media
 from django.forms.fields import CharField
-from django.forms.formsets import all_valid
+from django.forms.formsets import TOTAL_FORM_COUNT
 from django.http import Http404
+from django.template.response import TemplateResponse
 from django.utils.decorators import method_decorator
 from django.utils.encoding import force_unicode
 from django.utils.html import escape
+from django.utils.http import urlencode
 from django.utils.translation import ugettext as _
 from django.views.decorators.csrf import csrf_protect
 
@@ -61,6 +65,15 @@ except:
 class BaseRecursiveInlineMixin(object):
     inlines = []
     extra = 0
+    # insert the new rows of this inline with a single query; only used for
+    # models without many to many fields or parent models, and skips save()
+    # and the model signals
+    bulk_create = False
+
+    def get_formset(self, request, obj=None, **kwargs):
+        FormSet = super(BaseRecursiveInlineMixin, self).get_formset(request, obj, **kwargs)
+        FormSet.bulk_create = self.bulk_create
+        return FormSet
 
     def get_inline_instances(self, request, obj=None):
         for inline_class in self.inlines:
@@ -75,8 +88,154 @@ class BaseRecursiveInlineMixin(object):
             yield inline
 
 
+def get_request_cache(request, name):
+    """
+    Returns a dict stored on ``request`` under ``name``, used to share
+    computed admin metadata for the duration of a request.
+    """
+    attr = '_client_admin_%s' % name
+    try:
+        return getattr(request, attr)
+    except AttributeError:
+        setattr(request, attr, {})
+        return getattr(request, attr)
+
+
+def formset_tree_changed(formset):
+    """
+    Returns True if a form of ``formset``, or of a formset nested in one of
+    its forms, has changed. Unchanged formset trees are neither validated
+    nor saved.
+    """
+    try:
+        return formset._tree_changed
+    except AttributeError:
+        pass
+    changed = False
+    for form in formset.forms:
+        if form.has_changed() or any(formset_tree_changed(recursive_formset)
+                                     for recursive_formset in getattr(form, 'recursive_formsets', None) or ()):
+            changed = True
+            break
+    formset._tree_changed = changed
+    return changed
+
+
+# the modules whose inline methods ignore, or only pass on, the parent object
+_LIBRARY_MODULES = ('django.contrib.admin.options', 'django.contrib.contenttypes.admin',
+                    'django.contrib.contenttypes.generic', 'client_admin.admin')
+_OBJ_METHODS = ('get_formset', 'get_extra', 'get_min_num', 'get_max_num', 'get_fieldsets', 'get_fields',
+                'get_readonly_fields', 'get_prepopulated_fields', 'has_delete_permission')
+
+
+def inline_depends_on_obj(inline):
+    """
+    Returns True if ``inline`` overrides one of the methods that take the
+    parent object, so its formsets have to be built per parent.
+    """
+    for name in _OBJ_METHODS:
+        func = getattr(getattr(inline.__class__, name, None), '__func__', None)
+        if func is not None and func.__module__ not in _LIBRARY_MODULES:
+            return True
+    return False
+
+
+class InlinePlan(object):
+    """
+    What is needed to build and display the formsets of a nested inline:
+    the inline instance, its FormSet class, queryset, fieldsets, readonly
+    and prepopulated fields. Plans are computed once per request and reused
+    for every form of the parent formset, with ``obj=None``; inlines that
+    override a method taking the parent object get a plan per parent
+    instead, see ``get_inline_plan``.
+    """
+
+    def __init__(self, request, inline, obj=None):
+        self.inline = inline
+        self.obj = obj
+        self.depends_on_obj = inline_depends_on_obj(inline)
+        self.FormSet = inline.get_formset(request, obj)
+        self.queryset = inline.queryset(request)
+        self.fieldsets = list(inline.get_fieldsets(request, obj))
+        self.readonly = list(inline.get_readonly_fields(request, obj))
+        self.prepopulated = dict(inline.get_prepopulated_fields(request, obj))
+
+
+class ValidationReport(object):
+    """
+    The errors of a tree of inline formsets, collected in one pass by
+    ``RecursiveInlinesModelAdmin.validate_formsets``. Each entry is a dict
+    with the ``prefix`` of the invalid form or formset, the ``name`` of its
+    model and its ``errors``, so every error of the tree can be listed at
+    once in the change form.
+    """
+
+    def __init__(self):
+        self.entries = []
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    @property
+    def is_valid(self):
+        return not self.entries
+
+    def add(self, formset, prefix, errors):
+        self.entries.append({
+            'prefix': prefix,
+            'name': formset.model._meta.verbose_name,
+            'errors': errors,
+        })
+
+
+class MediaCollector(object):
+    """
+    Collects the media of a change form and its inlines. Paths are kept in
+    order and deduplicated with a set, and the media of an inline class is
+    collected once however many formsets display it, so large inline trees
+    don't pay for repeated ``Media`` additions.
+    """
+
+    def __init__(self, media=None):
+        self._js = []
+        self._css = {}
+        self._seen = set()
+        self._inlines = set()
+        if media is not None:
+            self.add(media)
+
+    def add(self, media):
+        for path in media._js:
+            if ('js', path) not in self._seen:
+                self._seen.add(('js', path))
+                self._js.append(path)
+        for medium, paths in media._css.items():
+            for path in paths:
+                if (medium, path) not in self._seen:
+                    self._seen.add((medium, path))
+                    self._css.setdefault(medium, []).append(path)
+
+    def add_inline(self, inline_admin_formset):
+        key = (inline_admin_formset.opts.__class__, inline_admin_formset.opts.model)
+        if key not in self._inlines:
+            self._inlines.add(key)
+            self.add(inline_admin_formset.media)
+
+    def get_media(self):
+        media = Media()
+        media._js = list(self._js)
+        media._css = dict((medium, list(paths)) for medium, paths in self._css.items())
+        return media
+
+
 class RecursiveInlinesModelAdmin(admin.ModelAdmin):
     grouped_fields = []
+    # nested inline levels deeper than this are loaded on demand, top-level
+    # inlines being level 1; None renders the whole tree
+    lazy_inline_depth = None
 
     def __init__(self, model, admin_site):
         media = list(getattr(self.Media, 'js', ()))
@@ -85,67 +244,277 @@ class RecursiveInlinesModelAdmin(admin.ModelAdmin):
         super(RecursiveInlinesModelAdmin, self).__init__(model, admin_site)
 
     def save_formset(self, request, form, formset, change):
+        if not formset_tree_changed(formset):
+            # nothing needs saving
+            formset.new_objects, formset.changed_objects, formset.deleted_objects = [], [], []
+            return
         for form in formset.forms:
             for recursive_formset in getattr(form, 'recursive_formsets', []):
                 self.save_formset(request, form, recursive_formset, change=change)
-        super(RecursiveInlinesModelAdmin, self).save_formset(request, form, formset, change=change)
+        if self.can_bulk_create(formset):
+            self.save_formset_in_bulk(request, form, formset, change=change)
+        else:
+            super(RecursiveInlinesModelAdmin, self).save_formset(request, form, formset, change=change)
 
-    def add_recursive_inline_formsets(self, request, inline, formset, obj=None):
-        for form in formset.forms:
-            recursive_formsets = []
-            if form.instance.pk:
-                if hasattr(inline, 'get_inline_instances'):
-                    for recursive_inline in inline.get_inline_instances(request, obj):
-                        FormSet = recursive_inline.get_formset(request, form.instance)
-                        prefix = "%s-%s" % (form.prefix, FormSet.get_default_prefix())
-                        if request.method == 'POST':
-                            recursive_formset = FormSet(request.POST, request.FILES, instance=form.instance, prefix=prefix, queryset=recursive_inline.queryset(request))
-                        else:
-                            recursive_formset = FormSet(instance=form.instance, prefix=prefix, queryset=recursive_inline.queryset(request))
-                        recursive_formsets.append(recursive_formset)
-                        if hasattr(recursive_inline, 'inlines'):
-                            self.add_recursive_inline_formsets(request, recursive_inline, recursive_formset)
-            form.recursive_formsets = recursive_formsets
-
-    def wrap_recursive_inline_formsets(self, request, inline, formset, obj=None):
-        media = None
-
-        def get_media(extra_media):
-            if media:
-                return media + extra_media
-            else:
-                return extra_media
+    def can_bulk_create(self, formset):
+        opts = formset.model._meta
+        return (getattr(formset, 'bulk_create', False) and not opts.many_to_many and not opts.parents and
+                not any(getattr(form, 'recursive_formsets', None) for form in formset.forms))
+
+    def save_formset_in_bulk(self, request, form, formset, change):
+        """
+        Saves ``formset`` like ``formset.save()``, but inserts its new
+        objects with a single query. Changed and deleted objects are still
+        saved one by one.
+        """
+        formset.save_existing_objects()
+        new_objects = []
+        for extra_form in formset.extra_forms:
+            if not extra_form.has_changed():
+                continue
+            if formset.can_delete and formset._should_delete_form(extra_form):
+                continue
+            new_objects.append(formset.save_new(extra_form, commit=False))
+        if new_objects:
+            formset.model._default_manager.bulk_create(new_objects)
+        formset.new_objects = new_objects
+
+    def get_inline_plans(self, request, inline, obj=None):
+        """
+        Returns the plans of the inlines nested in ``inline``, computed once
+        per request and inline class without a parent object. Use
+        ``get_inline_plan`` to get the plan of a given parent.
+        """
+        if not hasattr(inline, 'get_inline_instances'):
+            return []
+        plans = get_request_cache(request, 'inline_plans')
+        key = (inline.__class__, inline.model)
+        if key not in plans:
+            plans[key] = [InlinePlan(request, recursive_inline) for recursive_inline in inline.get_inline_instances(request, obj)]
+        return plans[key]
+
+    def get_inline_plan(self, request, plan, parent):
+        """
+        Returns the plan to build the formset of ``parent`` with: ``plan``
+        itself, or a plan computed for ``parent`` when the inline depends on
+        it.
+        """
+        if not plan.depends_on_obj or parent is None:
+            return plan
+        plans = get_request_cache(request, 'inline_parent_plans')
+        key = (plan.inline.__class__, plan.inline.model, parent.__class__, parent.pk)
+        if key not in plans:
+            plans[key] = InlinePlan(request, plan.inline, parent)
+        return plans[key]
+
+    def get_inline_children(self, plan, parents):
+        """
+        Fetches the objects of ``plan``'s inline for all ``parents`` with one
+        query and returns them grouped by the value of their foreign key, in
+        the order the formsets would have listed them. Returns None for
+        inlines that aren't attached with a foreign key.
+        """
+        fk = getattr(plan.FormSet, 'fk', None)
+        if fk is None or not parents:
+            return None
+        related_attname = fk.rel.get_related_field().attname
+        parents_by_key = dict((getattr(parent, related_attname), parent) for parent in parents)
+        queryset = plan.queryset.filter(**{'%s__in' % fk.name: list(parents_by_key)})
+        if not queryset.ordered:
+            queryset = queryset.order_by(queryset.model._meta.pk.name)
+        grouped = dict((key, []) for key in parents_by_key)
+        for child in queryset:
+            key = getattr(child, fk.get_attname())
+            # saves a query per child when the parent is displayed
+            setattr(child, fk.get_cache_name(), parents_by_key[key])
+            grouped[key].append(child)
+        return grouped
 
+    def add_recursive_inline_formsets(self, request, inline, formset, obj=None):
+        fk = getattr(formset, 'fk', None)
+        self._add_recursive_inline_formsets(request, inline, [formset], obj,
+                                            path=(inline.__class__.__name__,), root=formset.instance,
+                                            fk_chain=(fk.name,) if fk is not None else None)
+
+    def _add_recursive_inline_formsets(self, request, inline, formsets, obj=None, depth=1, path=(), root=None, fk_chain=None):
+        # builds a whole nesting level at once, so that the objects of every
+        # nested inline are fetched with one query per level
+        plans = self.get_inline_plans(request, inline, obj)
+        forms = [form for formset in formsets for form in formset.forms]
+        for form in forms:
+            form.recursive_formsets = []
+            form.lazy_recursive_inlines = []
+        parent_forms = [form for form in forms if form.instance.pk]
+        # lazy levels need a way back to the root for recursive_inline_view
+        can_be_lazy = (self.lazy_inline_depth is not None and root is not None and
+                       root.pk is not None and fk_chain is not None)
+        lazy = can_be_lazy and request.method != 'POST' and depth >= self.lazy_inline_depth
+        for plan in plans:
+            FormSet = plan.FormSet
+            inline_path = path + (plan.inline.__class__.__name__,)
+            loaded_forms = []
+            for form in parent_forms:
+                prefix = "%s-%s" % (form.prefix, FormSet.get_default_prefix())
+                if request.method == 'POST' and '%s-%s' % (prefix, TOTAL_FORM_COUNT) not in request.POST:
+                    # a lazy level that was never loaded, so nothing changed
+                    if can_be_lazy:
+                        self._add_lazy_recursive_inline(form, plan, prefix, inline_path, root)
+                elif lazy:
+                    self._add_lazy_recursive_inline(form, plan, prefix, inline_path, root)
+                else:
+                    loaded_forms.append(form)
+            if not loaded_forms:
+                continue
+            grouped = self.get_inline_children(plan, [form.instance for form in loaded_forms])
+            level = []
+            for form in loaded_forms:
+                form_plan = self.get_inline_plan(request, plan, form.instance)
+                prefix = "%s-%s" % (form.prefix, FormSet.get_default_prefix())
+                if request.method == 'POST':
+                    recursive_formset = form_plan.FormSet(request.POST, request.FILES, instance=form.instance, prefix=prefix, queryset=plan.queryset)
+                else:
+                    recursive_formset = form_plan.FormSet(instance=form.instance, prefix=prefix, queryset=plan.queryset)
+                if grouped is not None:
+                    related_attname = FormSet.fk.rel.get_related_field().attname
+                    recursive_formset._queryset = grouped[getattr(form.instance, related_attname)]
+                recursive_formset.inline_plan = form_plan
+                form.recursive_formsets.append(recursive_formset)
+                level.append(recursive_formset)
+            if level and hasattr(plan.inline, 'inlines'):
+                fk = getattr(FormSet, 'fk', None)
+                self._add_recursive_inline_formsets(request, plan.inline, level, depth=depth + 1, path=inline_path, root=root,
+                                                    fk_chain=fk_chain + (fk.name,) if fk_chain is not None and fk is not None else None)
+
+    def _add_lazy_recursive_inline(self, form, plan, prefix, inline_path, root):
+        # rendered as a placeholder, fetched by recursive_inline_view
+        query = urlencode({'inline': '/'.join(inline_path), 'parent': force_unicode(form.instance.pk), 'prefix': prefix})
+        form.lazy_recursive_inlines.append({
+            'title': plan.inline.verbose_name_plural,
+            'prefix': prefix,
+            'url': '%s?%s' % (self.get_recursive_inline_url(root), query),
+        })
+
+    def get_recursive_inline_url(self, obj):
+        info = self.model._meta.app_label, self.model._meta.model_name
+        return reverse('admin:%s_%s_recursive_inline' % info, args=(quote(obj.pk),), current_app=self.admin_site.name)
+
+    def wrap_recursive_inline_formsets(self, request, inline, formset, obj=None, media=None):
+        if media is None:
+            media = MediaCollector()
         for form in formset.forms:
             wrapped_recursive_formsets = []
-            if hasattr(form, 'recursive_formsets') and hasattr(inline, 'get_inline_instances'):
-                for recursive_inline, recursive_formset in zip(inline.get_inline_instances(request, obj), form.recursive_formsets):
-                    fieldsets = list(recursive_inline.get_fieldsets(request))
-                    readonly = list(recursive_inline.get_readonly_fields(request))
-                    prepopulated = dict(recursive_inline.get_prepopulated_fields(request))
-                    wrapped_recursive_formset = helpers.InlineAdminFormSet(recursive_inline, recursive_formset, fieldsets, prepopulated, readonly, model_admin=self)
+            if hasattr(form, 'recursive_formsets'):
+                # lazy and unsubmitted levels leave gaps, so every formset
+                # carries its own plan
+                for recursive_formset in form.recursive_formsets:
+                    plan = recursive_formset.inline_plan
+                    wrapped_recursive_formset = helpers.InlineAdminFormSet(plan.inline, recursive_formset, plan.fieldsets, plan.prepopulated, plan.readonly, model_admin=self)
                     wrapped_recursive_formsets.append(wrapped_recursive_formset)
-                    media = get_media(wrapped_recursive_formset.media)
-                    if hasattr(recursive_inline, 'inlines'):
-                        media = media + get_media(self.wrap_recursive_inline_formsets(request, recursive_inline, recursive_formset))
+                    media.add_inline(wrapped_recursive_formset)
+                    if hasattr(plan.inline, 'inlines'):
+                        self.wrap_recursive_inline_formsets(request, plan.inline, recursive_formset, media=media)
             form.recursive_formsets = wrapped_recursive_formsets
 
         return media
 
+    def get_urls(self):
+        info = self.model._meta.app_label, self.model._meta.model_name
+        custom_urls = patterns(
+            '',
+            url(r'^(.+)/recursive-inline/$', self.admin_site.admin_view(self.recursive_inline_view),
+                name='%s_%s_recursive_inline' % info),
+        )
+        return custom_urls + super(RecursiveInlinesModelAdmin, self).get_urls()
+
+    def recursive_inline_view(self, request, object_id):
+        """
+        Renders the nested formset of one parent form, for the levels below
+        ``lazy_inline_depth``. Takes the class names of the inlines leading to
+        it joined by slashes (``inline``), the primary key of the parent object
+        (``parent``) and the formset prefix (``prefix``) the change form would
+        have given it, so that the fragment submits with the rest of the form.
+        """
+        obj = self.get_object(request, unquote(object_id))
+        if not self.has_change_permission(request, obj):
+            raise PermissionDenied
+        if obj is None:
+            raise Http404(_('%(name)s object with primary key %(key)r does not exist.') % {'name': force_unicode(self.model._meta.verbose_name), 'key': escape(object_id)})
+
+        path = request.GET.get('inline', '').split('/')
+        prefix = request.GET.get('prefix', '')
+        if len(path) < 2 or not re.match(r'^[\w-]+$', prefix):
+            raise Http404
+        inline = dict((instance.__class__.__name__, instance) for instance in self.get_inline_instances(request, obj)).get(path[0])
+        if inline is None:
+            raise Http404
+        queryset = inline.get_queryset(request)
+        # the foreign keys leading from the parent back to obj
+        fk_chain = [getattr(inline.get_formset(request, obj), 'fk', None)]
+        plan = None
+        for name in path[1:]:
+            if inline is None:
+                raise Http404
+            if plan is not None:
+                queryset = plan.queryset
+                fk_chain.append(getattr(plan.FormSet, 'fk', None))
+            plan = dict((p.inline.__class__.__name__, p) for p in self.get_inline_plans(request, inline, obj)).get(name)
+            inline = plan.inline if plan is not None else None
+        if plan is None or None in fk_chain:
+            raise Http404
+        lookup = LOOKUP_SEP.join(fk.name for fk in reversed(fk_chain))
+        try:
+            parent = queryset.filter(**{lookup: obj}).get(pk=request.GET.get('parent'))
+        except (queryset.model.DoesNotExist, ValueError):
+            raise Http404
+
+        plan = self.get_inline_plan(request, plan, parent)
+        formset = plan.FormSet(instance=parent, prefix=prefix, queryset=plan.queryset)
+        formset.inline_plan = plan
+        if hasattr(plan.inline, 'inlines'):
+            fk = getattr(plan.FormSet, 'fk', None)
+            self._add_recursive_inline_formsets(request, plan.inline, [formset], depth=len(path), path=tuple(path), root=obj,
+                                                fk_chain=tuple(f.name for f in fk_chain) + (fk.name,) if fk is not None else None)
+        inline_admin_formset = helpers.InlineAdminFormSet(plan.inline, formset, plan.fieldsets, plan.prepopulated, plan.readonly, model_admin=self)
+        if hasattr(plan.inline, 'inlines'):
+            self.wrap_recursive_inline_formsets(request, plan.inline, formset)
+        return TemplateResponse(request, plan.inline.template, {
+            'inline_admin_formset': inline_admin_formset,
+            'original': obj,
+        }, current_app=self.admin_site.name)
+
     def all_valid(self, formsets):
-        if not all_valid(formsets):
-            return False
+        return self.validate_formsets(formsets).is_valid
+
+    def validate_formsets(self, formsets, report=None, nested=False):
+        """
+        Validates ``formsets`` and the formsets nested in their forms, cleaning
+        every form once, and returns a ``ValidationReport`` of all the errors
+        of the tree. Top-level formsets are always validated, so that their
+        ``clean()`` and form count checks run; unbound and unchanged nested
+        formset trees aren't.
+        """
+        if report is None:
+            report = ValidationReport()
         for formset in formsets:
-            if formset.is_bound:
-                for form in formset:
-                    if hasattr(form, 'recursive_formsets') and form.recursive_formsets:
-                        if not self.all_valid(form.recursive_formsets):
-                            return False
-                        # gross gross gross
-                        if not form.cleaned_data:
-                            form._errors['__all__'] = form.error_class(["Parent object must be created when creating nested inlines."])
-                            return False
-        return True
+            if not formset.is_bound or (nested and not formset_tree_changed(formset)):
+                continue
+            if not formset.is_valid():
+                if formset.non_form_errors():
+                    report.add(formset, formset.prefix, formset.non_form_errors())
+                for form in formset.forms:
+                    if form.errors:
+                        report.add(formset, form.prefix, form.errors)
+            for form in formset.forms:
+                recursive_formsets = getattr(form, 'recursive_formsets', None)
+                if not recursive_formsets:
+                    continue
+                self.validate_formsets(recursive_formsets, report, nested=True)
+                # gross gross gross
+                if not form.errors and not form.cleaned_data and any(
+                        formset_tree_changed(recursive_formset) for recursive_formset in recursive_formsets):
+                    form._errors['__all__'] = form.error_class(["Parent object must be created when creating nested inlines."])
+                    report.add(formset, form.prefix, form.errors)
+        return report
 
     @csrf_protect_m
     @transaction.atomic
@@ -158,6 +527,7 @@ class RecursiveInlinesModelAdmin(admin.ModelAdmin):
         if not self.has_add_permission(request):
             raise PermissionDenied
 
+        validation_report = None
         ModelForm = self.get_form(request)
         formsets = []
         inline_instances = self.get_inline_instances(request)
@@ -182,7 +552,8 @@ class RecursiveInlinesModelAdmin(admin.ModelAdmin):
                 formsets.append(formset)
                 if hasattr(inline, 'inlines') and inline.inlines:
                     self.add_recursive_inline_formsets(request, inline, formset)
-            if self.all_valid(formsets) and form_validated:
+            validation_report = self.validate_formsets(formsets)
+            if validation_report.is_valid and form_validated:
                 self.save_model(request, new_object, form, False)
                 self.save_related(request, form, formsets, False)
                 self.log_addition(request, new_object)
@@ -216,7 +587,7 @@ class RecursiveInlinesModelAdmin(admin.ModelAdmin):
             self.get_prepopulated_fields(request),
             self.get_readonly_fields(request),
             model_admin=self)
-        media = self.media + adminForm.media
+        media = MediaCollector(self.media + adminForm.media)
 
         inline_admin_formsets = []
         for inline, formset in zip(inline_instances, formsets):
@@ -227,18 +598,19 @@ class RecursiveInlinesModelAdmin(admin.ModelAdmin):
                 inline, formset, fieldsets, prepopulated,
                 readonly, model_admin=self)
             inline_admin_formsets.append(inline_admin_formset)
-            media = media + inline_admin_formset.media
+            media.add_inline(inline_admin_formset)
             if hasattr(inline, 'inlines'):
-                media = media + self.wrap_recursive_inline_formsets(request, inline, formset)
+                self.wrap_recursive_inline_formsets(request, inline, formset, media=media)
 
         context = {
             'title': _('Add %s') % force_unicode(opts.verbose_name),
             'adminform': adminForm,
             'is_popup': IS_POPUP_VAR in request.REQUEST,
             'show_delete': False,
-            'media': media,
+            'media': media.get_media(),
             'inline_admin_formsets': inline_admin_formsets,
             'errors': helpers.AdminErrorList(form, formsets),
+            'validation_report': validation_report,
             'app_label': opts.app_label,
             'preserved_filters': self.get_preserved_filters(request),
 
@@ -267,6 +639,7 @@ class RecursiveInlinesModelAdmin(admin.ModelAdmin):
                 'admin:%s_%s_add' % (opts.app_label, opts.model_name),
                 current_app=self.admin_site.name))
 
+        validation_report = None
         ModelForm = self.get_form(request, obj)
         formsets = []
         inline_instances = self.get_inline_instances(request, obj)
@@ -291,7 +664,8 @@ class RecursiveInlinesModelAdmin(admin.ModelAdmin):
                 if hasattr(inline, 'inlines') and inline.inlines:
                     self.add_recursive_inline_formsets(request, inline, formset, obj)
 
-            if self.all_valid(formsets) and form_validated:
+            validation_report = self.validate_formsets(formsets)
+            if validation_report.is_valid and form_validated:
                 self.save_model(request, new_object, form, True)
                 self.save_related(request, form, formsets, True)
                 change_message = self.construct_change_message(request, form, formsets)
@@ -317,7 +691,7 @@ class RecursiveInlinesModelAdmin(admin.ModelAdmin):
             self.get_prepopulated_fields(request, obj),
             self.get_readonly_fields(request, obj),
             model_admin=self)
-        media = self.media + adminForm.media
+        media = MediaCollector(self.media + adminForm.media)
 
         inline_admin_formsets = []
         for inline, formset in zip(inline_instances, formsets):
@@ -328,9 +702,9 @@ class RecursiveInlinesModelAdmin(admin.ModelAdmin):
                 inline, formset, fieldsets, prepopulated,
                 readonly, model_admin=self)
             inline_admin_formsets.append(inline_admin_formset)
-            media = media + inline_admin_formset.media
+            media.add_inline(inline_admin_formset)
             if hasattr(inline, 'inlines'):
-                media = media + self.wrap_recursive_inline_formsets(request, inline, formset, obj)
+                self.wrap_recursive_inline_formsets(request, inline, formset, obj, media=media)
 
         context = {
             'title': _('Change %s') % force_unicode(opts.verbose_name),
@@ -338,9 +712,10 @@ class RecursiveInlinesModelAdmin(admin.ModelAdmin):
             'object_id': object_id,
             'original': obj,
             'is_popup': IS_POPUP_VAR in request.REQUEST,
-            'media': media,
+            'media': media.get_media(),
             'inline_admin_formsets': inline_admin_formsets,
             'errors': helpers.AdminErrorList(form, formsets),
+            'validation_report': validation_report,
             'app_label': opts.app_label,
             'preserved_filters': self.get_preserved_filters(request),
 
@@ -352,6 +727,16 @@ class RecursiveInlinesModelAdmin(admin.ModelAdmin):
 class ReverseInlinesModelAdminMixin(object):
 
     def get_inline_instances(self, request, obj=None):
+        # instances are shared by every call made during a request
+        if request is not None:
+            instances = get_request_cache(request, 'inline_instances')
+            key = (id(self), obj.pk if obj is not None else None)
+            if key not in instances:
+                instances[key] = self._get_inline_instances(request, obj)
+            return list(instances[key])
+        return self._get_inline_instances(request, obj)
+
+    def _get_inline_instances(self, request, obj=None):
         inline_instances = super(ReverseInlinesModelAdminMixin, self).get_inline_instances(request, obj)
         if hasattr(self, 'inverse_inlines'):
             for inline_class in self.inverse_inlines:
@@ -389,8 +774,8 @@ class GenericModelAdminMixin(object):
             url(r'^obj/$', self.admin_site.admin_view(generic_lookup), name='admin_genericadmin_obj_lookup'),
             url(
                 r'^get-generic-rel-list/$',
-                self.admin_site.admin_view(get_generic_rel_list),
-                kwargs=opts,
+                self.admin_site.admin_view(get_generic_rel_list, cacheable=True),
+                kwargs=dict(opts, registry_key='%s.%s' % (self.__class__.__module__, self.__class__.__name__)),
                 name='admin_genericadmin_rel_list'),
         )
         return custom_urls + base_urls
@@ -451,6 +836,23 @@ class AdvancedSearchForm(Form):
             self.fields['%s__icontains' % item] = CharField(label=verbose_name)
 
 
+class ListQueryPlanMixin(object):
+    # load only the columns the changelist displays; True, or a list of more
+    # fields to load for display callables
+    list_projection = False
+
+    def get_changelist(self, request, **kwargs):
+        return ClientChangeList
+
+
+class DateHierarchyCountsMixin(object):
+    # read the date hierarchy of unfiltered changelists from the DateCount
+    # table, see the refresh_date_counts command. The table counts every
+    # object of the default manager, so it is ignored by admins that
+    # override get_queryset.
+    date_hierarchy_counts = False
+
+
 class AdvancedSearchMixin(object):
     advanced_search_titles = {}
 
@@ -487,7 +889,8 @@ class UnicodeForeignKeyRawIdWidgetMixin(object):
         """
         db = kwargs.get('using')
         if db_field.name in self.raw_id_fields:
-            kwargs['widget'] = UnicodeForeignKeyRawIdWidget(db_field.rel, self.admin_site, using=db)
+            collector = get_label_collector(request) if request is not None else None
+            kwargs['widget'] = UnicodeForeignKeyRawIdWidget(db_field.rel, self.admin_site, using=db, collector=collector)
         elif db_field.name in self.radio_fields:
             kwargs['widget'] = AdminRadioSelect(attrs={
                 'class': get_ul_class(self.radio_fields[db_field.name]),
@@ -495,6 +898,37 @@ class UnicodeForeignKeyRawIdWidgetMixin(object):
             kwargs['empty_label'] = db_field.blank and _('None') or None
         return db_field.formfield(**kwargs)
 
+    def render_change_form(self, request, context, *args, **kwargs):
+        # register every raw id value up front so that labels are fetched in
+        # bulk when the first widget renders
+        forms = []
+        if context.get('adminform'):
+            forms.append(context['adminform'].form)
+        for inline_admin_formset in context.get('inline_admin_formsets', ()):
+            forms.extend(_formset_forms(inline_admin_formset.formset))
+        for form in forms:
+            register_raw_id_values(form)
+        return super(UnicodeForeignKeyRawIdWidgetMixin, self).render_change_form(request, context, *args, **kwargs)
+
+
+def _formset_forms(formset):
+    for form in formset.forms:
+        yield form
+        for recursive_formset in getattr(form, 'recursive_formsets', None) or ():
+            # nested formsets are wrapped in InlineAdminFormSets by now
+            for recursive_form in _formset_forms(getattr(recursive_formset, 'formset', recursive_formset)):
+                yield recursive_form
+
+
+def register_raw_id_values(form):
+    """
+    Registers the values of the form's ``UnicodeForeignKeyRawIdWidget``s with
+    their label collector.
+    """
+    for name, field in form.fields.items():
+        if isinstance(field.widget, UnicodeForeignKeyRawIdWidget):
+            field.widget.register_value(form[name].value())
+
 
 class BaseClientAdminMixin(UnicodeForeignKeyRawIdWidgetMixin, GenericModelAdminMixin, AdvancedSearchMixin, ImageWidgetMixin, URLFieldMixin):
     formfield_overrides = dict(ImageWidgetMixin.formfield_overrides.items() + URLFieldMixin.formfield_overrides.items())
@@ -535,7 +969,7 @@ class GroupedInline(StackedInline):
     template = 'admin/edit_inline/grouped.html'
 
 
-class ClientModelAdmin(VersionAdmin, ReverseInlinesModelAdminMixin, BaseClientAdminMixin, RecursiveInlinesModelAdmin):
+class ClientModelAdmin(VersionAdmin, ReverseInlinesModelAdminMixin, BaseClientAdminMixin, ListQueryPlanMixin, DateHierarchyCountsMixin, RecursiveInlinesModelAdmin):
     pass
 
 # deprecated
@@ -0,0 +1,108 @@
+# Copyright 2013 Concentric Sky, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Memoized admin URLs of the registered models.
+"""
+from django.contrib import admin
+from django.core.urlresolvers import NoReverseMatch, get_script_prefix, get_urlconf, reverse
+from django.utils.encoding import force_text
+from django.utils import translation
+from django.utils.http import urlquote
+
+# stands for the primary key in the memoized change URLs
+PK_MARKER = '__client_admin_pk__'
+
+
+class AdminURLTable(object):
+    """
+    Maps every model registered with ``site`` to its changelist, add and
+    app index URLs, and to a ``(prefix, suffix)`` pair that per object change
+    URLs are formatted from. The table is built the first time it is used
+    for a script prefix, URLconf and language, and again when a model
+    registered since is looked up. Models that aren't registered are
+    reversed as usual.
+    """
+
+    def __init__(self, site):
+        self.site = site
+        self._tables = {}
+
+    def _reverse(self, viewname, args=None):
+        try:
+            return reverse(viewname, args=args, current_app=self.site.name)
+        except NoReverseMatch:
+            return None
+
+    def _build(self):
+        table = {}
+        for model in list(self.site._registry):
+            info = model._meta.app_label, model._meta.model_name
+            change = self._reverse('admin:%s_%s_change' % info, args=(PK_MARKER,))
+            table[model] = {
+                'changelist': self._reverse('admin:%s_%s_changelist' % info),
+                'add': self._reverse('admin:%s_%s_add' % info),
+                'app_list': self._reverse('admin:app_list', args=(model._meta.app_label,)),
+                'change': tuple(change.split(PK_MARKER, 1)) if change else None,
+            }
+        return table
+
+    def get_entry(self, model):
+        if model not in self.site._registry:
+            return None
+        key = (get_script_prefix(), get_urlconf(), translation.get_language())
+        table = self._tables.get(key)
+        if table is None or model not in table:
+            table = self._tables[key] = self._build()
+        return table.get(model)
+
+    def _get(self, model, name, viewname, args=None):
+        entry = self.get_entry(model)
+        if entry is None or entry[name] is None:
+            # raises NoReverseMatch like it always did
+            return reverse(viewname, args=args, current_app=self.site.name)
+        return entry[name]
+
+    def changelist(self, model):
+        info = model._meta.app_label, model._meta.model_name
+        return self._get(model, 'changelist', 'admin:%s_%s_changelist' % info)
+
+    def add(self, model):
+        info = model._meta.app_label, model._meta.model_name
+        return self._get(model, 'add', 'admin:%s_%s_add' % info)
+
+    def app_list(self, model):
+        return self._get(model, 'app_list', 'admin:app_list', args=(model._meta.app_label,))
+
+    def change(self, model, pk):
+        entry = self.get_entry(model)
+        if entry is None or entry['change'] is None:
+            info = model._meta.app_label, model._meta.model_name
+            return reverse('admin:%s_%s_change' % info, args=(pk,), current_app=self.site.name)
+        prefix, suffix = entry['change']
+        return '%s%s%s' % (prefix, urlquote(force_text(pk)), suffix)
+
+
+_url_tables = {}
+
+
+def get_admin_urls(site=None):
+    """
+    Returns the URL table of an admin site, ``admin.site`` by default.
+    """
+    site = site or admin.site
+    try:
+        return _url_tables[site]
+    except KeyError:
+        return _url_tables.setdefault(site, AdminURLTable(site))
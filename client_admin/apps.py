@@ -0,0 +1,30 @@
+# Copyright 2013 Concentric Sky, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from django.apps import AppConfig
+from django.db.models.signals import post_save, post_delete
+
+
+class ClientAdminConfig(AppConfig):
+    name = 'client_admin'
+
+    def ready(self):
+        from client_admin.cache import model_changed, watch_models
+        from client_admin.modules import get_declared_cache_models
+
+        # every process bumps the versions of the models cached modules
+        # depend on, whether or not it renders the dashboard
+        watch_models(['contenttypes.contenttype'] + sorted(get_declared_cache_models()))
+        post_save.connect(model_changed, dispatch_uid='client_admin_model_versions_save')
+        post_delete.connect(model_changed, dispatch_uid='client_admin_model_versions_delete')
@@ -0,0 +1,64 @@
+# Copyright 2013 Concentric Sky, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Periodic background work done outside of the request/response cycle.
+"""
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask(object):
+    """
+    Calls ``run`` every ``interval`` seconds from a daemon thread. The thread
+    is started lazily by the first call to ``ensure_started``, so nothing runs
+    in processes that never render the admin.
+    """
+    interval = 60
+
+    def __init__(self, interval=None):
+        if interval is not None:
+            self.interval = interval
+        self._thread = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+
+    def run(self):
+        raise NotImplementedError
+
+    def ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name=self.__class__.__name__)
+                self._thread.daemon = True
+                self._thread.start()
+
+    def wakeup(self):
+        """
+        Runs the task again without waiting for the interval to elapse.
+        """
+        self._wakeup.set()
+
+    def _loop(self):
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            try:
+                self.run()
+            except Exception:
+                logger.exception('%s failed', self.__class__.__name__)
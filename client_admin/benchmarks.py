@@ -0,0 +1,92 @@
+# Copyright 2013 Concentric Sky, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Timings of the changelist row rendering, to be run from a Django shell::
+
+    >>> from django.test import RequestFactory
+    >>> from client_admin.benchmarks import benchmark_changelist
+    >>> request = RequestFactory().get('/admin/books/book/')
+    >>> request.user = User.objects.get(username='admin')
+    >>> benchmark_changelist(request, Book)
+"""
+import time
+
+from django.contrib import admin
+from django.utils.encoding import force_text
+
+from client_admin.templatetags.admin_list import RowRenderer, items_for_result
+
+
+def _best_of(repeat, func):
+    timings = []
+    for i in range(repeat):
+        start = time.time()
+        func()
+        timings.append(time.time() - start)
+    return min(timings)
+
+
+def benchmark_rows(cl, repeat=5):
+    """
+    Renders the rows of ``cl`` with ``items_for_result`` and with a
+    ``RowRenderer`` built for every run, and returns the best time of
+    ``repeat`` runs of each along with the number of rows and cells.
+    """
+    forms = cl.formset.forms if cl.formset else [None] * len(cl.result_list)
+    rows = list(zip(cl.result_list, forms))
+
+    def render_generator():
+        for result, form in rows:
+            [force_text(cell) for cell in items_for_result(cl, result, form)]
+
+    def render_compiled():
+        renderer = RowRenderer(cl)
+        for result, form in rows:
+            [force_text(cell) for cell in renderer.render(result, form)]
+
+    return {
+        'rows': len(rows),
+        'cells': len(rows) * len(cl.list_display),
+        'items_for_result': _best_of(repeat, render_generator),
+        'row_renderer': _best_of(repeat, render_compiled),
+    }
+
+
+def get_changelist(request, model, site=None):
+    """
+    Returns the ChangeList ``request`` would display for ``model``, without
+    its list_editable formset.
+    """
+    model_admin = (site or admin.site)._registry[model]
+    list_display = model_admin.get_list_display(request)
+    if model_admin.get_actions(request):
+        list_display = ['action_checkbox'] + list(list_display)
+    ChangeList = model_admin.get_changelist(request)
+    cl = ChangeList(request, model, list_display,
+                    model_admin.get_list_display_links(request, list_display),
+                    model_admin.get_list_filter(request), model_admin.date_hierarchy,
+                    model_admin.get_search_fields(request), model_admin.list_select_related,
+                    model_admin.list_per_page, model_admin.list_max_show_all,
+                    model_admin.list_editable, model_admin)
+    cl.formset = None
+    return cl
+
+
+def benchmark_changelist(request, model, site=None, repeat=5):
+    """
+    Builds the ChangeList ``request`` would display for ``model`` and
+    returns ``benchmark_rows`` for its first page.
+    """
+    return benchmark_rows(get_changelist(request, model, site), repeat)
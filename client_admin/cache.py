@@ -0,0 +1,136 @@
+# Copyright 2013 Concentric Sky, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Helpers shared by the client admin render caches.
+
+Everything is stored in the cache named by the ``CLIENT_ADMIN_CACHE``
+setting (``'default'`` if unset).
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import get_cache
+from django.utils.encoding import force_text
+from django.utils.translation import get_language
+
+KEY_PREFIX = 'client_admin'
+
+_watched_models = set()
+
+
+def get_admin_cache():
+    """
+    Returns the cache backend used by client admin.
+    """
+    return get_cache(getattr(settings, 'CLIENT_ADMIN_CACHE', 'default'))
+
+
+def make_key(*parts):
+    """
+    Builds a cache key from the given parts and the active language. Parts are
+    hashed so that the key is safe for memcached.
+    """
+    parts = parts + (get_language(),)
+    digest = hashlib.md5(u':'.join(force_text(p) for p in parts).encode('utf-8')).hexdigest()
+    return '%s:%s' % (KEY_PREFIX, digest)
+
+
+def model_label(model):
+    return '%s.%s' % (model._meta.app_label, model._meta.model_name)
+
+
+def _version_key(label):
+    return '%s:version:%s' % (KEY_PREFIX, label.lower())
+
+
+def _version_seed():
+    # versions restart from the current time when their key is evicted, so
+    # that values cached under older versions aren't served again
+    return int(time.time() * 1000000)
+
+
+def get_model_versions(labels):
+    """
+    Returns a tuple with the current version of each model label. A version
+    changes whenever an instance of a watched model is saved or deleted, in
+    any process, so it can be made part of a cache key to invalidate it.
+    """
+    if not labels:
+        return ()
+    watch_models(labels)
+    cache = get_admin_cache()
+    keys = [_version_key(label) for label in labels]
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        for key in missing:
+            cache.add(key, _version_seed(), None)
+        versions.update(cache.get_many(missing))
+    return tuple(versions.get(key, 0) for key in keys)
+
+
+def bump_model_version(label):
+    cache = get_admin_cache()
+    key = _version_key(label)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, _version_seed(), None)
+
+
+def watch_models(labels):
+    """
+    Adds the given model labels to the models whose versions are bumped when
+    an instance is saved or deleted. The app config watches the
+    ``cache_models`` of the dashboard modules and the ContentType model at
+    startup; other labels are watched by the processes that read them.
+    """
+    for label in labels:
+        _watched_models.add(label.lower())
+
+
+def model_changed(sender, **kwargs):
+    """
+    Bumps the version of the saved or deleted model, and of its concrete
+    model when it is a proxy or a deferred class, if they are watched.
+    Models that aren't watched cost a set lookup.
+    """
+    labels = set([model_label(sender), model_label(sender._meta.concrete_model)])
+    for label in labels & _watched_models:
+        bump_model_version(label)
+
+
+def permission_fingerprint(user, perms=None):
+    """
+    Returns a short hash identifying the permissions of ``user``. Users with
+    the same permissions share the same fingerprint. ``perms`` may be given
+    when the user's permission set is already known.
+    """
+    if not user.is_active:
+        perms = ''
+    elif user.is_superuser:
+        perms = '*'
+    else:
+        perms = ','.join(sorted(perms if perms is not None else user.get_all_permissions()))
+    return hashlib.md5(perms.encode('utf-8')).hexdigest()
+
+
+def bookmarks_key(user_id):
+    return '%s:bookmarks:%s' % (KEY_PREFIX, user_id)
+
+
+def preferences_key(user_id, dashboard_id):
+    return '%s:preferences:%s:%s' % (KEY_PREFIX, user_id, hashlib.md5(dashboard_id.encode('utf-8')).hexdigest())
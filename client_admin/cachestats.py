@@ -0,0 +1,128 @@
+# Copyright 2013 Concentric Sky, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Background sampling of cache backend statistics.
+
+The ``CLIENT_ADMIN_CACHE_STATS_INTERVAL`` setting controls how often the
+backends are sampled (60 seconds by default) and
+``CLIENT_ADMIN_CACHE_STATS_HISTORY`` how many samples are kept (60 by
+default).
+"""
+import collections
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import get_cache
+
+from client_admin.background import PeriodicTask
+
+
+class CacheStatsCollector(PeriodicTask):
+    """
+    Keeps a ring buffer of ``(timestamp, stats)`` samples, where ``stats`` is
+    a list of ``(server_name, server_stats)`` tuples for every cache backend
+    that supports ``get_stats``.
+    """
+
+    def __init__(self, interval=None, history=None):
+        if interval is None:
+            interval = getattr(settings, 'CLIENT_ADMIN_CACHE_STATS_INTERVAL', 60)
+        if history is None:
+            history = getattr(settings, 'CLIENT_ADMIN_CACHE_STATS_HISTORY', 60)
+        super(CacheStatsCollector, self).__init__(interval)
+        self._samples = collections.deque(maxlen=history)
+        self._first_sample_lock = threading.Lock()
+
+    def run(self):
+        self._samples.append((time.time(), self.sample()))
+
+    def sample(self):
+        cache_stats = []
+        for cache_backend_nm in settings.CACHES:
+            try:
+                cache_backend = get_cache(cache_backend_nm)
+                this_backend_stats = cache_backend._cache.get_stats()
+            except AttributeError:  # this backend probably doesn't support that
+                continue
+            for server_name, server_stats in this_backend_stats:
+                cache_stats.append(("%s: %s" % (cache_backend_nm, server_name), server_stats))
+        return cache_stats
+
+    def samples(self):
+        """
+        Returns the buffered samples, oldest first. The first call in a process
+        takes a sample right away and starts the collector thread.
+        """
+        if not self._samples:
+            with self._first_sample_lock:
+                if not self._samples:
+                    self.run()
+        self.ensure_started()
+        return list(self._samples)
+
+    def latest(self):
+        """
+        Returns the stats of the most recent sample.
+        """
+        return self.samples()[-1][1]
+
+    def history(self, server_name, key):
+        """
+        Returns ``(timestamp, value)`` pairs for a single stat of a server.
+        """
+        values = []
+        for timestamp, stats in self.samples():
+            for name, server_stats in stats:
+                if name == server_name and key in server_stats:
+                    try:
+                        values.append((timestamp, float(server_stats[key])))
+                    except (TypeError, ValueError):
+                        pass
+        return values
+
+
+def ratio_series(numerators, denominators):
+    """
+    Returns the percentage of each numerator over the matching denominator.
+    """
+    return [100 * n[1] / d[1] if d[1] else 0 for n, d in zip(numerators, denominators)]
+
+
+def rate_series(values):
+    """
+    Turns a series of ``(timestamp, counter)`` pairs into per-second rates.
+    """
+    rates = []
+    for (t1, v1), (t2, v2) in zip(values, values[1:]):
+        if t2 > t1 and v2 >= v1:
+            rates.append((v2 - v1) / (t2 - t1))
+    return rates
+
+
+def sparkline_points(values, width=100, height=20):
+    """
+    Returns the ``points`` attribute of an SVG polyline drawing ``values``.
+    """
+    if len(values) < 2:
+        return ''
+    low, high = min(values), max(values)
+    spread = (high - low) or 1
+    step = float(width) / (len(values) - 1)
+    return ' '.join('%.1f,%.1f' % (i * step, height - (v - low) * height / spread)
+                    for i, v in enumerate(values))
+
+
+cache_stats_collector = CacheStatsCollector()
@@ -0,0 +1,265 @@
+# Copyright 2013 Concentric Sky, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+The ChangeList of client admin model admins, which plans the related
+objects and the columns its rows display.
+"""
+import logging
+
+from django.contrib.admin.views.main import ChangeList
+from django.contrib.contenttypes.fields import GenericRelation
+from django.db.models import FieldDoesNotExist
+from django.db.models.constants import LOOKUP_SEP
+from django.utils import six
+
+logger = logging.getLogger(__name__)
+
+
+def _relation_path(model, path):
+    """
+    Returns the relations ``path`` traverses from ``model``, in the syntax of
+    ``prefetch_related``, whether it can be followed with ``select_related``
+    and the model it ends on. Trailing non-relational fields are dropped.
+    """
+    opts = model._meta
+    parts = []
+    single = True
+    for name in path.split(LOOKUP_SEP):
+        try:
+            field, owner, direct, m2m = opts.get_field_by_name(name)
+        except FieldDoesNotExist:
+            # relations declared for prefetch_related name reverse relations
+            # by their accessor rather than their query name
+            field = _reverse_relation(opts, name)
+            if field is None:
+                break
+            direct = False
+        if direct and not m2m:
+            if not field.rel:
+                break
+            if isinstance(field, GenericRelation):
+                # generic relations can only be prefetched
+                single = False
+            parts.append(name)
+            opts = field.rel.to._meta
+        elif direct:
+            single = False
+            parts.append(name)
+            opts = field.rel.to._meta
+        else:
+            # reverse relations are prefetched through their accessor
+            single = False
+            parts.append(field.get_accessor_name())
+            opts = field.model._meta
+    return LOOKUP_SEP.join(parts), single, opts.concrete_model
+
+
+def _reverse_relation(opts, accessor_name):
+    """
+    Returns the reverse relation of ``opts`` whose accessor is
+    ``accessor_name``, or None.
+    """
+    for related in opts.get_all_related_objects() + opts.get_all_related_many_to_many_objects():
+        if related.get_accessor_name() == accessor_name:
+            return related
+    return None
+
+
+def _required_paths(model, prefix, seen=(), depth=5):
+    """
+    Yields ``prefix`` extended with the non-null foreign keys of ``model``,
+    recursively, as ``select_related()`` without arguments follows them, so
+    a selected relation whose ``__str__`` reads its own foreign keys doesn't
+    query them per row.
+    """
+    seen = seen + (model,)
+    for field in model._meta.fields:
+        if not field.rel or field.null or isinstance(field, GenericRelation):
+            continue
+        path = LOOKUP_SEP.join((prefix, field.name))
+        to = field.rel.to._meta.concrete_model
+        yield path
+        if depth > 1 and to not in seen:
+            for path in _required_paths(to, path, seen, depth - 1):
+                yield path
+
+
+def _declared_paths(attr):
+    paths = getattr(attr, 'relations', ())
+    if isinstance(paths, six.string_types):
+        paths = (paths,)
+    order_field = getattr(attr, 'admin_order_field', None)
+    if isinstance(order_field, six.string_types) and LOOKUP_SEP in order_field:
+        paths = tuple(paths) + (order_field.lstrip('-'),)
+    return paths
+
+
+class ListQueryPlan(object):
+    """
+    The ``select_related`` and ``prefetch_related`` lookups needed by the
+    columns of ``list_display``: foreign keys displayed as is, and the
+    relations that display callables traverse. Callables declare them in a
+    ``relations`` attribute, a lookup path or a list of them, next to
+    ``admin_order_field``, whose related part is used as well::
+
+        def publisher(self, obj):
+            return obj.book.publisher.name
+        publisher.relations = 'book__publisher'
+
+    Selected relations are followed along their non-null foreign keys like
+    ``select_related()`` does; generic relations are prefetched.
+    """
+
+    def __init__(self, model_admin, list_display):
+        self.model = model_admin.model
+        select_related = set()
+        prefetch_related = set()
+        for item in list_display:
+            for path in self.get_paths(model_admin, item):
+                path, single, to = _relation_path(self.model, path)
+                if not path:
+                    continue
+                if single:
+                    select_related.add(path)
+                    select_related.update(_required_paths(to, path, (self.model,)))
+                else:
+                    prefetch_related.add(path)
+        # select_related('a__b') already joins a
+        self.select_related = sorted(path for path in select_related
+                                     if not any(other.startswith(path + LOOKUP_SEP) for other in select_related))
+        self.prefetch_related = sorted(prefetch_related)
+
+    def get_paths(self, model_admin, item):
+        if callable(item):
+            return _declared_paths(item)
+        try:
+            field = self.model._meta.get_field(item)
+        except FieldDoesNotExist:
+            pass
+        else:
+            return (item,) if field.rel else ()
+        if hasattr(model_admin, item):
+            return _declared_paths(getattr(model_admin, item))
+        return _declared_paths(getattr(self.model, item, None))
+
+    def apply(self, queryset):
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        return queryset
+
+    def __repr__(self):
+        return '<ListQueryPlan %s.%s select_related=%r prefetch_related=%r>' % (
+            self.model._meta.app_label, self.model._meta.model_name, self.select_related, self.prefetch_related)
+
+
+def get_list_query_plan(model_admin, list_display):
+    """
+    Returns the plan of ``list_display``, computed once per model admin.
+    """
+    plans = model_admin.__dict__.setdefault('_client_admin_list_plans', {})
+    key = tuple(list_display)
+    if key not in plans:
+        plans[key] = ListQueryPlan(model_admin, list_display)
+    return plans[key]
+
+
+class ClientChangeList(ChangeList):
+    """
+    Applies the ``ListQueryPlan`` of ``list_display`` when the model admin
+    leaves ``list_select_related`` to its default. The plan is logged at the
+    debug level and kept as ``list_query_plan``.
+
+    When the model admin sets ``list_projection``, only the columns the rows
+    display are loaded: the fields of ``list_display``,
+    ``list_display_links`` and ``list_editable``, the fields display
+    callables sort by, the relations that are selected or prefetched, the
+    primary key and ``to_field``. ``list_projection`` can be a list of more
+    fields to load, for display callables that read other fields. As
+    ``__str__`` can read any field, the rows of a ``list_display`` showing
+    it are only projected when ``list_projection`` is such a list. The
+    projection applies to the displayed page only, not to the queryset
+    actions receive.
+    """
+
+    def get_results(self, request):
+        # project the displayed page only; actions and the date hierarchy
+        # get full objects from get_queryset
+        if not self.use_projection():
+            return super(ClientChangeList, self).get_results(request)
+        self.list_projection = self.get_projection()
+        logger.debug('Changelist projection of %s.%s: %r',
+                     self.lookup_opts.app_label, self.lookup_opts.model_name, self.list_projection)
+        queryset = self.queryset
+        self.queryset = queryset.only(*self.list_projection)
+        try:
+            super(ClientChangeList, self).get_results(request)
+        finally:
+            self.queryset = queryset
+
+    def use_projection(self):
+        projection = getattr(self.model_admin, 'list_projection', False)
+        if not projection:
+            return False
+        # __str__ can read any field, so it needs the fields listed
+        return '__str__' not in self.list_display or isinstance(projection, six.string_types + (list, tuple))
+
+    def get_projection(self):
+        opts = self.lookup_opts
+        fields = set([opts.pk.name])
+        if self.to_field:
+            fields.add(opts.get_field(self.to_field).name)
+
+        def add(name):
+            # the local field a column or lookup starts with, if any
+            try:
+                fields.add(opts.get_field(name.lstrip('-').split(LOOKUP_SEP)[0]).name)
+            except FieldDoesNotExist:
+                return False
+            return True
+
+        extra = self.model_admin.list_projection
+        if isinstance(extra, six.string_types):
+            extra = (extra,)
+        elif not isinstance(extra, (list, tuple)):
+            extra = ()
+        for item in list(self.list_display) + list(self.list_display_links or ()) + list(self.list_editable) + list(extra):
+            if not callable(item) and add(item):
+                continue
+            if callable(item):
+                attr = item
+            else:
+                attr = getattr(self.model_admin, item, None) or getattr(self.model, item, None)
+            order_field = getattr(attr, 'admin_order_field', None)
+            if isinstance(order_field, six.string_types):
+                add(order_field)
+        if self.list_select_related is False:
+            plan = get_list_query_plan(self.model_admin, self.list_display)
+            related = plan.select_related + plan.prefetch_related
+        elif isinstance(self.list_select_related, (list, tuple)):
+            related = self.list_select_related
+        else:
+            related = ()
+        for path in related:
+            add(path)
+        return sorted(fields)
+
+    def apply_select_related(self, qs):
+        if self.list_select_related is not False:
+            return super(ClientChangeList, self).apply_select_related(qs)
+        self.list_query_plan = get_list_query_plan(self.model_admin, self.list_display)
+        logger.debug('Changelist query plan: %r', self.list_query_plan)
+        return self.list_query_plan.apply(qs)
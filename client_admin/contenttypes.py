@@ -0,0 +1,183 @@
+# Copyright 2013 Concentric Sky, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Cached views of the ContentType table used by the generic relation widgets.
+"""
+import hashlib
+import threading
+
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+from django.conf import settings
+from django.contrib.admin.widgets import url_params_from_lookup_dict
+from django.contrib.contenttypes.models import ContentType
+from django.db.models.signals import post_migrate
+
+from client_admin.cache import bump_model_version, get_model_versions, model_label
+
+
+def get_generation():
+    """
+    Returns the version of the ContentType model, bumped in the shared admin
+    cache every time a ContentType is saved or deleted. Cached content type
+    payloads are only valid for the generation they were built with, in
+    every process.
+    """
+    return get_model_versions([model_label(ContentType)])[0]
+
+
+def content_types_migrated(**kwargs):
+    # migrate creates content types with bulk_create, which sends no signals
+    bump_model_version(model_label(ContentType))
+
+
+post_migrate.connect(content_types_migrated, dispatch_uid='client_admin_content_types_migrate')
+
+
+class GenerationCache(object):
+    """
+    A dict that empties itself when the content type generation changes, or
+    when it holds more than ``max_size`` entries.
+    """
+
+    def __init__(self, max_size=None):
+        self._data = {}
+        self._generation = None
+        self._lock = threading.Lock()
+        self.max_size = max_size
+
+    def get(self, key, build):
+        generation = get_generation()
+        if generation != self._generation:
+            with self._lock:
+                self._data = {}
+                self._generation = generation
+        try:
+            return self._data[key]
+        except KeyError:
+            value = build()
+            with self._lock:
+                if self._generation == generation:
+                    if self.max_size is not None and len(self._data) >= self.max_size:
+                        self._data = {}
+                    self._data[key] = value
+            return value
+
+
+class GenericRelRegistry(object):
+    """
+    Builds the content type mapping served by the ``get_generic_rel_list``
+    view once per admin and set of content types its whitelist and blacklist
+    select, and keeps it until a ContentType is saved or deleted. At most
+    ``CLIENT_ADMIN_GENERIC_REL_CACHE_SIZE`` mappings (100 by default) are
+    kept.
+    """
+
+    def __init__(self):
+        self._payloads = GenerationCache(getattr(settings, 'CLIENT_ADMIN_GENERIC_REL_CACHE_SIZE', 100))
+
+    def get_payload(self, key=None, whitelist=(), blacklist=(), url_params={}):
+        """
+        Returns a ``(content, etag)`` tuple where content is the JSON mapping
+        of content type ids to ``(app_label/model, url_params)`` pairs.
+        """
+        if key is None:
+            key = repr(sorted(url_params.items()))
+        # whitelists and blacklists from request.GET are arbitrary strings,
+        # so the mapping is keyed on the content types they select
+        rows = self.select(whitelist, blacklist)
+        cache_key = (key, tuple(c.id for c in rows))
+        return self._payloads.get(cache_key, lambda: self._build(rows, url_params))
+
+    def select(self, whitelist=(), blacklist=()):
+        """
+        Returns the content types a whitelist or, without one, a blacklist
+        lets through.
+        """
+        rows = []
+        for c in content_type_serializer.rows():
+            val = u'%s/%s' % (c.app_label, c.model)
+            if whitelist:
+                if val not in whitelist:
+                    continue
+            elif val in blacklist:
+                continue
+            rows.append(c)
+        return rows
+
+    def _build(self, rows, url_params):
+        obj_dict = {}
+        for c in rows:
+            params = url_params.get('%s.%s' % (c.app_label, c.model), {})
+            obj_dict[c.id] = (u'%s/%s' % (c.app_label, c.model), url_params_from_lookup_dict(params))
+        return _with_etag(json.dumps(obj_dict, ensure_ascii=False))
+
+
+class ContentTypeSerializer(object):
+    """
+    Serializes the ContentType table for the generic relation JavaScript.
+    Two formats are available:
+
+    ``objects``
+        ``{id: {pk: id, app: app_label, model: model}}``, as used by the
+        ``get_content_types`` template tag.
+
+    ``labels``
+        ``{id: 'app_label.model'}``, as used by the
+        ``get_generic_relation_list`` Jinja helper.
+
+    Output is memoized until the content type generation changes.
+    """
+    formats = ('objects', 'labels')
+
+    def __init__(self):
+        self._cache = GenerationCache()
+
+    def rows(self):
+        return self._cache.get('rows', lambda: list(ContentType.objects.all().order_by('id')))
+
+    def as_json(self, format='objects'):
+        """
+        Returns a ``(content, etag)`` tuple for the given format.
+        """
+        if format not in self.formats:
+            raise ValueError('Unknown content type format: "%s"' % format)
+        return self._cache.get(format, lambda: _with_etag(json.dumps(self._build(format))))
+
+    def as_script(self, format='objects'):
+        """
+        Returns a ``(content, etag)`` tuple for a script that assigns the
+        serialized content types to ``MODEL_URL_ARRAY``.
+        """
+        def build():
+            content = self.as_json(format)[0]
+            return _with_etag('var MODEL_URL_ARRAY = %s;' % content)
+        return self._cache.get(('script', format), build)
+
+    def _build(self, format):
+        if format == 'labels':
+            return dict((c.id, '%s.%s' % (c.app_label, c.model)) for c in self.rows())
+        return dict((c.id, {'pk': c.id, 'app': c.app_label, 'model': c.model}) for c in self.rows())
+
+
+def _with_etag(content):
+    return content, hashlib.md5(content.encode('utf-8')).hexdigest()
+
+
+content_type_serializer = ContentTypeSerializer()
+generic_rel_registry = GenericRelRegistry()
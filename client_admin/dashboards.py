@@ -16,17 +16,29 @@
 Module where client admin dashboard classes are defined.
 """
 
+import logging
+import Queue
+import sys
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections
 from django.template.defaultfilters import slugify
+from django.utils import six, timezone, translation
 from django.utils.importlib import import_module
 from django.utils.translation import ugettext_lazy as _
 from django.core.urlresolvers import reverse
-from django.core.cache import get_cache
 from django.contrib.contenttypes.models import ContentType
-from django.conf import settings
 
 from client_admin import modules
+from client_admin.cachestats import cache_stats_collector
+from client_admin.cache import get_admin_cache, get_model_versions, make_key
+from client_admin.permissions import get_permission_snapshot
 from client_admin.utils import uniquify
 
+logger = logging.getLogger(__name__)
+
 
 class Dashboard(object):
     """
@@ -45,12 +57,30 @@ class Dashboard(object):
     ``columns``
         An integer that represents the number of columns for the dashboard.
         Default value: 2.
+
+    ``workers``
+        The number of threads used to initialize modules. With more than one
+        worker, modules are initialized in parallel by a pool of threads
+        shared by every request, and a module that hasn't finished
+        ``timeout`` (or the dashboard's ``module_timeout``) seconds after it
+        was submitted is replaced by a placeholder. When the pool already has
+        ``workers`` modules waiting for a thread, modules are initialized by
+        the request instead. Default value: the
+        ``CLIENT_ADMIN_DASHBOARD_WORKERS`` setting, or 1.
+
+    ``module_timeout``
+        Default number of seconds a module may take to initialize when
+        modules run in parallel. Default value: the
+        ``CLIENT_ADMIN_DASHBOARD_MODULE_TIMEOUT`` setting, or 5.
     """
 
     title = _('Dashboard')
     template = 'client_admin/dashboard/dashboard.html'
     columns = 2
     children = None
+    workers = None
+    module_timeout = None
+    module_timings = None
 
     class Media:
         css = ()
@@ -100,16 +130,7 @@ class Dashboard(object):
         ))
 
         # append a Memcached Status module only if there are any statuses to display
-        cache_display = False
-        for cache_backend_nm, cache_backend_attrs in settings.CACHES.iteritems():
-            try:
-                cache_backend = get_cache(cache_backend_nm)
-                this_backend_stats = cache_backend._cache.get_stats()
-                if this_backend_stats:
-                    cache_display = True
-            except AttributeError:  # this backend probably doesn't support that
-                continue
-        if cache_display:
+        if cache_stats_collector.latest():
             self.children.append(modules.MemcachedStatus())
 
     def get_id(self):
@@ -123,9 +144,253 @@ class Dashboard(object):
         seen = set()
         for id, module in enumerate(self.children):
             module.id = uniquify(module.id or str(id+1), seen)
+            module.url = self.get_module_url(module)
             module._prepare_children()
 
-    def init_children_with_context(self, context):
-        for module in self.children:
+    def get_module_url(self, module):
+        """
+        Returns the url that renders ``module`` on its own.
+        """
+        return reverse('client-admin-dashboard-module', args=(self.get_id(), module.id))
+
+    def init_children_with_context(self, context, preferences=None):
+        """
+        Initializes the modules. Modules that are deferred, or that the user's
+        ``preferences`` mark as disabled or collapsed, are replaced by
+        placeholders that load the module over AJAX when needed.
+        """
+        self.module_timings = {}
+        pending = []
+        for index, module in enumerate(self.children):
+            if self.is_module_deferred(module, preferences or {}):
+                self.children[index] = self.get_deferred_placeholder(module, eager=module.deferred)
+            else:
+                pending.append((index, module))
+
+        workers = self.workers or getattr(settings, 'CLIENT_ADMIN_DASHBOARD_WORKERS', 1)
+        if workers <= 1 or len(pending) <= 1:
+            for index, module in pending:
+                self._timed_init(module, context)
+            return
+
+        pool = _get_module_pool(workers)
+        # every module gets its timeout from the time it is submitted, so the
+        # dashboard waits at most the longest timeout however many modules
+        # it has
+        submitted = time.time()
+        tasks, inline = [], []
+        for index, module in pending:
+            task = _ModuleTask(self, module, context)
+            if pool.submit(task):
+                tasks.append((index, task))
+            else:
+                # the pool is busy, possibly with abandoned modules
+                inline.append(module)
+        for module in inline:
+            self._timed_init(module, context)
+
+        for index, task in tasks:
+            timeout = task.module.timeout or self.get_module_timeout()
+            if task.done.wait(max(0, submitted + timeout - time.time())):
+                if task.exc_info:
+                    six.reraise(*task.exc_info)
+                self._record_timing(task.module, task.elapsed)
+            elif task.abandon():
+                logger.warning('Dashboard module %r timed out after %s seconds', task.module.title, timeout)
+                self.module_timings[task.module.id] = None
+                self.children[index] = task.module.placeholder(_('This module took too long to load.'))
+            elif task.exc_info:
+                # finished while timing out
+                six.reraise(*task.exc_info)
+            else:
+                self._record_timing(task.module, task.elapsed)
+
+    def is_module_deferred(self, module, preferences):
+        """
+        Returns True if the module should be loaded after the dashboard is
+        displayed rather than while rendering it.
+        """
+        if module.deferred:
+            return True
+        element_id = 'module_%s' % module.id
+        if (preferences.get('disabled') or {}).get(element_id, not module.enabled):
+            return True
+        return bool((preferences.get('collapsed') or {}).get(element_id))
+
+    def get_deferred_placeholder(self, module, eager=False):
+        """
+        Returns a placeholder for a deferred module. Eager placeholders are
+        loaded as soon as the dashboard is displayed, the others when the
+        module is expanded or added back to the dashboard.
+        """
+        placeholder = module.placeholder(_('Loading...'))
+        placeholder.deferred_url = module.url
+        placeholder.deferred_eager = eager
+        return placeholder
+
+    def get_module_timeout(self):
+        return self.module_timeout or getattr(settings, 'CLIENT_ADMIN_DASHBOARD_MODULE_TIMEOUT', 5)
+
+    def _timed_init(self, module, context):
+        started = time.time()
+        self.init_module_with_context(module, context)
+        self._record_timing(module, time.time() - started)
+
+    def _record_timing(self, module, elapsed):
+        self.module_timings[module.id] = elapsed
+        logger.debug('Dashboard module %r initialized in %.3f seconds', module.title, elapsed)
+
+    def init_module_with_context(self, module, context):
+        """
+        Initializes a single module. Modules that declare a ``cache_timeout``
+        are restored from the dashboard cache when possible.
+        """
+        if not module.cache_timeout:
+            module.init_with_context(context)
+            return
+        cache = get_admin_cache()
+        key = self.get_module_cache_key(module, context)
+        state = cache.get(key)
+        if state is not None:
+            module.set_cache_state(state)
+        else:
             module.init_with_context(context)
+            cache.set(key, module.get_cache_state(), module.cache_timeout)
+
+    def get_module_cache_key(self, module, context):
+        """
+        Returns the cache key of a module for the current user. The key
+        changes with the user's permissions and with the versions of the
+        models the module depends on.
+        """
+        request = context['request']
+        return make_key(
+            'dashboard', self.get_id(), module.id,
+            '%s.%s' % (module.__class__.__module__, module.__class__.__name__),
+            request.user.pk, get_permission_snapshot(request).fingerprint(),
+            get_model_versions(module.get_cache_models()),
+        )
+
+
+def get_dashboard():
+    """
+    Returns an instance of the dashboard class named by the
+    ``CLIENT_ADMIN_DASHBOARD`` setting, or of the default dashboard.
+    """
+    dashboard_cls = getattr(settings, 'CLIENT_ADMIN_DASHBOARD', None)
+    if dashboard_cls:
+        try:
+            mod, inst = dashboard_cls.rsplit('.', 1)
+            mod = import_module(mod)
+            return getattr(mod, inst)()
+        except:
+            pass
+    return Dashboard()
+
+
+class _ModuleTask(object):
+    """
+    Initializes a module in a pool thread. A task that the dashboard has
+    abandoned isn't started, and its result is dropped if it was running.
+    """
+
+    def __init__(self, dashboard, module, context):
+        self.dashboard = dashboard
+        self.module = module
+        self.context = context
+        self.language = translation.get_language()
+        self.timezone = timezone.get_current_timezone()
+        self.done = threading.Event()
+        self.start_time = None
+        self.elapsed = None
+        self.exc_info = None
+        self._abandoned = False
+        self._lock = threading.Lock()
+
+    def abandon(self):
+        """
+        Gives up on the task, unless it is already done. Returns True if the
+        task was abandoned.
+        """
+        with self._lock:
+            if not self.done.is_set():
+                self._abandoned = True
+            return self._abandoned
+
+    def run(self):
+        with self._lock:
+            if self._abandoned:
+                return
+            self.start_time = time.time()
+        # translations and time zones are activated per thread
+        translation.activate(self.language)
+        timezone.activate(self.timezone)
+        elapsed, exc_info = None, None
+        try:
+            self.dashboard.init_module_with_context(self.module, self.context)
+            elapsed = time.time() - self.start_time
+        except Exception:
+            exc_info = sys.exc_info()
+        finally:
+            translation.deactivate()
+            timezone.deactivate()
+            for connection in connections.all():
+                connection.close()
+            with self._lock:
+                if not self._abandoned:
+                    self.elapsed, self.exc_info = elapsed, exc_info
+                    self.done.set()
+
+
+class _ModulePool(object):
+    """
+    A fixed number of daemon threads, started on first use, that run the
+    module tasks of every request. At most ``size`` tasks wait for a thread
+    beyond the idle ones; threads still running abandoned tasks aren't idle.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self._queue = Queue.Queue()
+        self._threads = []
+        self._idle = 0
+        self._lock = threading.Lock()
+
+    def submit(self, task):
+        """
+        Queues ``task`` and returns True, or returns False when the backlog
+        is full.
+        """
+        with self._lock:
+            while len(self._threads) < self.size:
+                thread = threading.Thread(target=self._work, name='client-admin-dashboard-%s' % len(self._threads))
+                thread.daemon = True
+                thread.start()
+                self._threads.append(thread)
+            if self._queue.qsize() - self._idle >= self.size:
+                return False
+            self._queue.put(task)
+            return True
+
+    def _work(self):
+        while True:
+            with self._lock:
+                self._idle += 1
+            task = self._queue.get()
+            with self._lock:
+                self._idle -= 1
+            try:
+                task.run()
+            except Exception:
+                logger.exception('Dashboard module task failed')
+
+
+_module_pools = {}
+_module_pools_lock = threading.Lock()
+
 
+def _get_module_pool(size):
+    with _module_pools_lock:
+        if size not in _module_pools:
+            _module_pools[size] = _ModulePool(size)
+        return _module_pools[size]
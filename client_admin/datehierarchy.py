@@ -0,0 +1,159 @@
+# Copyright 2013 Concentric Sky, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Counts behind the changelist date hierarchy.
+
+Counts are cached for ``CLIENT_ADMIN_DATE_HIERARCHY_TIMEOUT`` seconds (an
+hour by default), and until an object of the changelist's model is saved or
+deleted. Filters on related models only expire with the timeout.
+"""
+import datetime
+import hashlib
+
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.contenttypes.models import ContentType
+from django.db import connections, models, transaction
+from django.db.models.sql.datastructures import EmptyResultSet
+from django.utils import six, timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.encoding import force_text
+
+from client_admin.cache import get_admin_cache, get_model_versions, make_key, model_label
+from client_admin.models import DateCount
+
+
+def _to_date(value):
+    if isinstance(value, six.string_types):
+        value = parse_datetime(value) or parse_date(value)
+    if isinstance(value, datetime.datetime):
+        value = value.date()
+    return value
+
+
+def bucket_counts(queryset, field, level):
+    """
+    Returns ``(date, count)`` pairs of the objects of ``queryset`` per
+    ``level`` ('year', 'month' or 'day') of the date ``field``, oldest first,
+    with a single grouped query. ``date`` is the first day of the bucket.
+    """
+    connection = connections[queryset.db]
+    qn = connection.ops.quote_name
+    # also joins the parent table of fields inherited from a concrete model
+    queryset = queryset.filter(**{'%s__isnull' % field.name: False})
+    column = '%s.%s' % (qn(field.model._meta.db_table), qn(field.column))
+    if isinstance(field, models.DateTimeField):
+        tzname = timezone.get_current_timezone_name() if settings.USE_TZ else None
+        sql, params = connection.ops.datetime_trunc_sql(level, column, tzname)
+    else:
+        sql, params = connection.ops.date_trunc_sql(level, column), []
+    rows = queryset.order_by().extra(select={'bucket': sql}, select_params=params).values('bucket').annotate(
+        count=models.Count('pk', distinct=queryset.query.distinct))
+    counts = {}
+    for row in rows:
+        day = _to_date(row['bucket'])
+        if day is not None:
+            counts[day] = counts.get(day, 0) + row['count']
+    return sorted(counts.items())
+
+
+class DateHistogram(object):
+    """
+    The number of rows of changelist ``cl`` per year, month and day of its
+    ``date_hierarchy`` field. Counts are read from the ``DateCount`` table
+    when the model admin sets ``date_hierarchy_counts``, doesn't override
+    ``get_queryset`` and the changelist isn't filtered, and from a cached
+    grouped query otherwise.
+    """
+
+    def __init__(self, cl):
+        self.cl = cl
+        self.model = cl.model
+        self.field = cl.lookup_opts.get_field(cl.date_hierarchy)
+
+    def is_filtered(self):
+        # drill-down lookups are applied to the table as well
+        date_prefix = '%s__' % self.field.name
+        return bool(self.cl.query) or any(not key.startswith(date_prefix) for key in self.cl.get_filters_params())
+
+    def is_scoped(self):
+        # the table counts every object, so admins that narrow their
+        # queryset, e.g. per user, don't use it
+        get_queryset = self.cl.model_admin.get_queryset
+        return getattr(get_queryset, '__func__', None) is not admin.ModelAdmin.get_queryset.__func__
+
+    def use_table(self):
+        return (getattr(self.cl.model_admin, 'date_hierarchy_counts', False) and
+                not self.is_filtered() and not self.is_scoped())
+
+    def buckets(self, level, year=None, month=None):
+        """
+        Returns ``(date, count)`` pairs per ``level``, within ``year`` and
+        ``month`` when given.
+        """
+        if self.use_table():
+            return self.table_buckets(level, year, month)
+        queryset = self.cl.query_set
+        if year:
+            queryset = queryset.filter(**{'%s__year' % self.field.name: year})
+        if month:
+            queryset = queryset.filter(**{'%s__month' % self.field.name: month})
+        try:
+            sql, params = queryset.query.sql_with_params()
+        except EmptyResultSet:
+            return []
+        label = model_label(self.model)
+        key = make_key('date_hierarchy', label, self.field.name, level,
+                       hashlib.md5(force_text(sql).encode('utf-8') + force_text(repr(params)).encode('utf-8')).hexdigest(),
+                       get_model_versions([label]), timezone.get_current_timezone_name())
+        cache = get_admin_cache()
+        counts = cache.get(key)
+        if counts is None:
+            counts = bucket_counts(queryset, self.field, level)
+            cache.set(key, counts, getattr(settings, 'CLIENT_ADMIN_DATE_HIERARCHY_TIMEOUT', 60 * 60))
+        return counts
+
+    def table_buckets(self, level, year=None, month=None):
+        days = DateCount.objects.filter(content_type=ContentType.objects.get_for_model(self.model),
+                                        field_name=self.field.name)
+        if year:
+            days = days.filter(day__year=year)
+        if month:
+            days = days.filter(day__month=month)
+        counts = {}
+        for day, count in days.values_list('day', 'count'):
+            if level == 'year':
+                day = day.replace(month=1, day=1)
+            elif level == 'month':
+                day = day.replace(day=1)
+            counts[day] = counts.get(day, 0) + count
+        return sorted(counts.items())
+
+
+def refresh_date_counts(model, field_name):
+    """
+    Recounts the objects of ``model``'s default manager per day of
+    ``field_name`` into the ``DateCount`` table.
+    """
+    field = model._meta.get_field(field_name)
+    counts = bucket_counts(model._default_manager.all(), field, 'day')
+    content_type = ContentType.objects.get_for_model(model)
+    with transaction.atomic():
+        DateCount.objects.filter(content_type=content_type, field_name=field_name).delete()
+        DateCount.objects.bulk_create([
+            DateCount(content_type=content_type, field_name=field_name, day=day, count=count)
+            for day, count in counts
+        ])
+    return len(counts)
@@ -0,0 +1,158 @@
+# Copyright 2013 Concentric Sky, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Background fetching of the feeds displayed by the Feed dashboard module.
+
+Feeds are refreshed every ``CLIENT_ADMIN_FEED_INTERVAL`` seconds (900 by
+default) with conditional requests that time out after
+``CLIENT_ADMIN_FEED_TIMEOUT`` seconds (10 by default). The last good
+snapshot of every feed is kept in the client admin cache.
+"""
+import datetime
+import hashlib
+import logging
+import threading
+import time
+import urllib2
+
+try:
+    import feedparser
+except ImportError:
+    feedparser = None
+
+from django.conf import settings
+
+from client_admin.background import PeriodicTask
+from client_admin.cache import KEY_PREFIX, get_admin_cache
+
+logger = logging.getLogger(__name__)
+
+FEEDPARSER_MISSING = 'You must install the FeedParser python module'
+
+
+def _snapshot_key(url):
+    return '%s:feed:%s' % (KEY_PREFIX, hashlib.md5(url.encode('utf-8')).hexdigest())
+
+
+def _entry(entry):
+    item = {
+        'title': entry.get('title', ''),
+        'url': entry.get('link', ''),
+    }
+    try:
+        item['date'] = datetime.date(*entry.updated_parsed[0:3])
+    except:
+        # no date for certain feeds
+        pass
+    return item
+
+
+class FeedFetcher(PeriodicTask):
+    """
+    Refreshes the registered feed URLs from a daemon thread. A snapshot is a
+    dict with the parsed ``entries`` and the ``etag`` and ``modified``
+    validators sent back on the next request, so unchanged feeds cost a
+    ``304 Not Modified``.
+    """
+
+    def __init__(self, interval=None, timeout=None):
+        if interval is None:
+            interval = getattr(settings, 'CLIENT_ADMIN_FEED_INTERVAL', 60 * 15)
+        super(FeedFetcher, self).__init__(interval)
+        self.timeout = timeout or getattr(settings, 'CLIENT_ADMIN_FEED_TIMEOUT', 10)
+        self._urls = set()
+        self._urls_lock = threading.Lock()
+
+    def register(self, url):
+        """
+        Adds ``url`` to the feeds refreshed in the background. A feed that
+        has no snapshot yet is fetched right away. Nothing is refreshed when
+        feedparser isn't installed.
+        """
+        if feedparser is None:
+            logger.warning('%s to display the feed %s', FEEDPARSER_MISSING, url)
+            return
+        if url not in self._urls:
+            with self._urls_lock:
+                self._urls.add(url)
+            if self.get_snapshot(url) is None:
+                self.wakeup()
+        self.ensure_started()
+
+    def run(self):
+        for url in list(self._urls):
+            try:
+                self.refresh(url)
+            except Exception:
+                logger.exception('Could not refresh feed %s', url)
+
+    def refresh(self, url):
+        """
+        Fetches ``url`` and stores a new snapshot, unless the server reports
+        that the feed hasn't changed or it can't be parsed. Raises
+        ImportError if feedparser isn't installed.
+        """
+        if feedparser is None:
+            raise ImportError(FEEDPARSER_MISSING)
+        snapshot = self.get_snapshot(url)
+        request = urllib2.Request(url)
+        if snapshot:
+            if snapshot.get('etag'):
+                request.add_header('If-None-Match', snapshot['etag'])
+            if snapshot.get('modified'):
+                request.add_header('If-Modified-Since', snapshot['modified'])
+        try:
+            response = urllib2.urlopen(request, timeout=self.timeout)
+        except urllib2.HTTPError as e:
+            if e.code != 304:
+                raise
+            return snapshot
+        try:
+            content = response.read()
+        finally:
+            response.close()
+
+        feed = feedparser.parse(content)
+        if feed.bozo and not feed.entries:
+            logger.warning('Could not parse feed %s: %s', url, feed.get('bozo_exception'))
+            return snapshot
+        snapshot = {
+            'entries': [_entry(entry) for entry in feed.entries],
+            'etag': response.info().getheader('ETag'),
+            'modified': response.info().getheader('Last-Modified'),
+            'fetched': time.time(),
+        }
+        get_admin_cache().set(_snapshot_key(url), snapshot, None)
+        return snapshot
+
+    def get_snapshot(self, url):
+        return get_admin_cache().get(_snapshot_key(url))
+
+    def entries(self, url):
+        """
+        Returns the entries of the last good snapshot of ``url``, or None if
+        the feed hasn't been fetched yet. Registers the feed as a side effect.
+        Raises ImportError if feedparser isn't installed.
+        """
+        if feedparser is None:
+            raise ImportError(FEEDPARSER_MISSING)
+        self.register(url)
+        snapshot = self.get_snapshot(url)
+        if snapshot is None:
+            return None
+        return snapshot['entries']
+
+
+feed_fetcher = FeedFetcher()
@@ -13,18 +13,27 @@
 # limitations under the License.
 
 import math
+
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
 import jingo
 import jinja2
+from client_admin.adminurls import get_admin_urls
+from client_admin.cache import get_admin_cache, make_key, preferences_key
 from client_admin.items import Bookmarks
-from client_admin.models import DashboardPreferences, Bookmark
+from client_admin.models import DashboardPreferences
 from client_admin.menus import Menu
-from client_admin.dashboards import Dashboard
+from client_admin.dashboards import get_dashboard
+from client_admin.contenttypes import content_type_serializer
+from client_admin.permissions import get_permission_snapshot
+from client_admin.views import get_content_types_url
 from django.utils.importlib import import_module
 from django.conf import settings
 from django import template
 from django.db.models import Model
-from django.contrib.contenttypes.models import ContentType
-from django.core.urlresolvers import reverse
 from django.core.cache import get_cache
 
 if get_cache.__module__.startswith('debug_toolbar'):
@@ -56,7 +65,7 @@ def edit_link(context, obj, label='Edit'):
 
     app_label = obj._meta.app_label
     model_name = obj._meta.model_name
-    edit_link = reverse('admin:%s_%s_change' % (app_label, model_name), args=(obj.id,))
+    edit_link = get_admin_urls().change(obj.__class__, obj.id)
 
     if check_permission(request=context['request'], mode_name='change', app_label=app_label, model_name=model_name):
         return '<a href="%s" target="_blank">%s</a>' % (edit_link, label)
@@ -72,11 +81,19 @@ def get_generic_relation_list(request):
     Syntax::
         {{ get_generic_relation_list }}
     """
-    return_string = "var MODEL_URL_ARRAY = {"
-    for c in ContentType.objects.all().order_by('id'):
-        return_string = "%s%d: '%s.%s'," % (return_string, c.id, c.app_label, c.model)
-    return_string = "%s}" % return_string[:-1]
-    return return_string
+    return content_type_serializer.as_script('labels')[0]
+
+
+@jingo.register.function
+def get_generic_relation_list_url():
+    """
+    Returns a cacheable URL serving the same script as
+    ``get_generic_relation_list``, to be used as a ``<script src>``.
+
+    Syntax::
+        <script src="{{ get_generic_relation_list_url() }}"></script>
+    """
+    return get_content_types_url('labels')
 
 
 # # get\_menu(context)
@@ -104,21 +121,65 @@ def get_menu(context):
     else:
         menu = Menu()
 
-    menu.init_with_context(context)
+    request = context['request']
+    cache = get_admin_cache()
+    cache_key = None
+    cached_menu = None
+    if menu.cache_timeout:
+        cache_key = make_key(
+            'menu', '%s.%s' % (menu.__class__.__module__, menu.__class__.__name__),
+            get_permission_snapshot(request).fingerprint(),
+        )
+        cached_menu = cache.get(cache_key)
+
+    bookmark_items = None
+    if cached_menu is not None:
+        menu = cached_menu
+        bookmark_items = [c for c in menu.children if isinstance(c, Bookmarks)]
+        for item in bookmark_items:
+            item.init_with_context(context)
+    else:
+        menu.init_with_context(context)
+        bookmark_items = [c for c in menu.children if isinstance(c, Bookmarks)]
+        if cache_key:
+            cache.set(cache_key, menu, menu.cache_timeout)
+
     has_bookmark_item = False
     bookmark = None
-    if len([c for c in menu.children if isinstance(c, Bookmarks)]) > 0:
+    if len(bookmark_items) > 0:
         # - if the user has any bookmarks
         has_bookmark_item = True
-        url = context['request'].get_full_path()
-        try:
-            # - this user's bookmark of this page
-            bookmark = Bookmark.objects.filter(user=context['request'].user, url=url)[0]
-        except:
-            pass
+        # - this user's bookmark of this page
+        bookmark = bookmark_items[0].get_bookmark(request.get_full_path())
     return [menu, has_bookmark_item, bookmark]
 
 
+def get_dashboard_preferences(user, dashboard_id):
+    """
+    Returns the preferences data of ``user`` for a dashboard, creating an
+    empty preferences object the first time. The data is kept in the client
+    admin cache until the preferences are saved.
+    """
+    cache = get_admin_cache()
+    key = preferences_key(user.pk, dashboard_id)
+    preferences = cache.get(key)
+    if preferences is None:
+        try:
+            preferences = DashboardPreferences.objects.get(
+                user=user,
+                dashboard_id=dashboard_id
+            ).data
+        except DashboardPreferences.DoesNotExist:
+            preferences = '{}'
+            DashboardPreferences(
+                user=user,
+                dashboard_id=dashboard_id,
+                data=preferences
+            ).save()
+        cache.set(key, preferences)
+    return preferences
+
+
 # # get\_current\_dashboard(context)
 
 # To use:
@@ -137,33 +198,16 @@ def get_current_dashboard(context):
         return [None, None, None, None]
     # - an instance of the dashboard
 
-    dashboard_cls = getattr(settings, 'CLIENT_ADMIN_DASHBOARD', None)
-    if dashboard_cls:
-        try:
-            mod, inst = dashboard_cls.rsplit('.', 1)
-            mod = import_module(mod)
-            dashboard = getattr(mod, inst)()
-        except:
-            dashboard = Dashboard()
-    else:
-        dashboard = Dashboard()
-
+    dashboard = get_dashboard()
     dashboard.init_with_context(context)
     dashboard._prepare_children()
-    dashboard.init_children_with_context(context)
+    # - the user's dashboard preferences
+    preferences = get_dashboard_preferences(context['request'].user, dashboard.get_id())
     try:
-        # - the user's dashboard preferences
-        preferences = DashboardPreferences.objects.get(
-            user=context['request'].user,
-            dashboard_id=dashboard.get_id()
-        ).data
-    except DashboardPreferences.DoesNotExist:
-        preferences = '{}'
-        DashboardPreferences(
-            user=context['request'].user,
-            dashboard_id=dashboard.get_id(),
-            data=preferences
-        ).save()
+        parsed_preferences = json.loads(preferences)
+    except ValueError:
+        parsed_preferences = {}
+    dashboard.init_children_with_context(context, parsed_preferences)
     # - where the modules should be split for a two-column view
     # - which modules have been disabled
     return [
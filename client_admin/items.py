@@ -342,6 +342,7 @@ class Bookmarks(MenuItem, AppListElementMixin):
 
     """
     title = _('Bookmarks')
+    bookmarks = None
 
     def __init__(self, title=None, **kwargs):
         super(Bookmarks, self).__init__(title, **kwargs)
@@ -353,13 +354,26 @@ class Bookmarks(MenuItem, AppListElementMixin):
         Please refer to the :meth:`~client_admin.menu.items.MenuItem.init_with_context`
         documentation from :class:`~client_admin.menu.items.MenuItem` class.
         """
-        from client_admin.models import Bookmark
+        from client_admin.models import get_user_bookmarks
 
-        for b in Bookmark.objects.filter(user=context['request'].user):
-            self.children.append(MenuItem(mark_safe(b.title), b.url))
+        self.bookmarks = get_user_bookmarks(context['request'].user)
+        self.children = [MenuItem(mark_safe(b.title), b.url) for b in self.bookmarks]
+        self.enabled = len(self.children) > 0
 
-        if not len(self.children):
-            self.enabled = False
+    def get_bookmark(self, url):
+        """
+        Returns the user's bookmark of ``url``, if any.
+        """
+        for bookmark in self.bookmarks or ():
+            if bookmark.url == url:
+                return bookmark
+        return None
+
+    def __getstate__(self):
+        # bookmarks are cached per user, apart from the cached menu
+        state = self.__dict__.copy()
+        state.update(children=[], bookmarks=None)
+        return state
 
     def is_selected(self, request):
         """
@@ -0,0 +1,32 @@
+# Copyright 2013 Concentric Sky, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from django.contrib import admin
+from django.core.management.base import BaseCommand
+
+from client_admin.cache import model_label
+from client_admin.datehierarchy import refresh_date_counts
+
+
+class Command(BaseCommand):
+    help = ('Recounts the objects per day of the date hierarchy of every model '
+            'admin that sets date_hierarchy_counts. Meant to be run periodically.')
+
+    def handle(self, *args, **options):
+        for model, model_admin in admin.site._registry.items():
+            if not (model_admin.date_hierarchy and getattr(model_admin, 'date_hierarchy_counts', False)):
+                continue
+            days = refresh_date_counts(model, model_admin.date_hierarchy)
+            if int(options.get('verbosity', 1)) > 1:
+                self.stdout.write('%s.%s: %s days' % (model_label(model), model_admin.date_hierarchy, days))
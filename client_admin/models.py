@@ -14,6 +14,9 @@
 
 from django.conf import settings
 from django.db import models
+from django.db.models.signals import post_save, post_delete
+
+from client_admin.cache import bookmarks_key, get_admin_cache, preferences_key
 
 
 AUTH_USER_MODEL = getattr(settings, 'AUTH_USER_MODEL', 'auth.User')
@@ -49,3 +52,55 @@ class DashboardPreferences(models.Model):
     class Meta:
         db_table = 'client_admin_dashboard_preferences'
         ordering = ('user',)
+
+
+class DateCount(models.Model):
+    """
+    The number of objects per day of a model's date field, read by the date
+    hierarchy of changelists whose admin sets ``date_hierarchy_counts``.
+    Filled by the ``refresh_date_counts`` management command.
+    """
+    content_type = models.ForeignKey('contenttypes.ContentType')
+    field_name = models.CharField(max_length=100)
+    day = models.DateField()
+    count = models.PositiveIntegerField()
+
+    def __unicode__(self):
+        return "%s.%s %s: %s" % (self.content_type, self.field_name, self.day, self.count)
+
+    class Meta:
+        db_table = 'client_admin_date_count'
+        ordering = ('day',)
+        unique_together = (('content_type', 'field_name', 'day'),)
+
+
+def clear_cached_preferences(sender, instance, **kwargs):
+    get_admin_cache().delete(preferences_key(instance.user_id, instance.dashboard_id))
+
+post_save.connect(clear_cached_preferences, sender=DashboardPreferences,
+                  dispatch_uid='client_admin_clear_cached_preferences_save')
+post_delete.connect(clear_cached_preferences, sender=DashboardPreferences,
+                    dispatch_uid='client_admin_clear_cached_preferences_delete')
+
+
+def get_user_bookmarks(user):
+    """
+    Returns the bookmarks of ``user``. The list is kept in the client admin
+    cache until one of the user's bookmarks is saved or deleted.
+    """
+    cache = get_admin_cache()
+    key = bookmarks_key(user.pk)
+    bookmarks = cache.get(key)
+    if bookmarks is None:
+        bookmarks = list(Bookmark.objects.filter(user=user))
+        cache.set(key, bookmarks)
+    return bookmarks
+
+
+def clear_cached_bookmarks(sender, instance, **kwargs):
+    get_admin_cache().delete(bookmarks_key(instance.user_id))
+
+post_save.connect(clear_cached_bookmarks, sender=Bookmark,
+                  dispatch_uid='client_admin_clear_cached_bookmarks_save')
+post_delete.connect(clear_cached_bookmarks, sender=Bookmark,
+                    dispatch_uid='client_admin_clear_cached_bookmarks_delete')
@@ -18,13 +18,19 @@ Module where client admin dashboard modules classes are defined.
 from django.apps import apps as app_registry
 from django.contrib import admin
 from django.db.models import get_model
+from django.db.models.query import prefetch_related_objects
 from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.utils.encoding import force_text
 from django.utils.text import capfirst
-from django.core.cache import get_cache
-from django.core.urlresolvers import reverse
 from django.contrib.contenttypes.models import ContentType
 from django.utils.translation import ugettext_lazy as _
 
+from client_admin.cache import model_label
+from client_admin.cachestats import cache_stats_collector, rate_series, ratio_series, sparkline_points
+from client_admin.feeds import FEEDPARSER_MISSING, feed_fetcher
+from client_admin.permissions import get_permission_snapshot
+from client_admin.timeline import ActionTimeline
 from client_admin.utils import *
 
 
@@ -76,6 +82,27 @@ class DashboardModule(object):
     ``template``
         The template to use to render the module.
         Default value: 'client_admin/dashboard/module.html'.
+
+    ``cache_timeout``
+        Number of seconds the initialized module is kept in the dashboard
+        cache, per user and permission set. ``None`` disables caching.
+        Default value: ``None``.
+
+    ``cache_models``
+        A list of model labels (e.g. "admin.logentry"). Saving or deleting
+        an instance of one of these models invalidates the cached module.
+        Default value: ``()``.
+
+    ``timeout``
+        Number of seconds the module may take to initialize when the
+        dashboard initializes modules in parallel. Default value: ``None``,
+        which means the dashboard's ``module_timeout`` is used.
+
+    ``deferred``
+        Boolean that determines whether the module is loaded over AJAX once
+        the dashboard is displayed, instead of while the dashboard is
+        rendered. Disabled and collapsed modules are always loaded when they
+        are shown. Default value: ``False``.
     """
 
     template = 'client_admin/dashboard/module.html'
@@ -91,6 +118,14 @@ class DashboardModule(object):
     post_content = None
     children = None
     id = None
+    cache_timeout = None
+    cache_models = ()
+    cache_attributes = ('children', 'pre_content', 'post_content')
+    timeout = None
+    deferred = False
+    deferred_url = None
+    url = None
+    deferred_eager = False
 
     def __init__(self, title=None, **kwargs):
         if title is not None:
@@ -195,6 +230,47 @@ class DashboardModule(object):
     def _prepare_children(self):
         pass
 
+    def placeholder(self, message):
+        """
+        Returns an empty module that takes the place of this one on the
+        dashboard and displays ``message``.
+        """
+        placeholder = DashboardModule(
+            self.title,
+            enabled=self.enabled,
+            draggable=self.draggable,
+            collapsible=self.collapsible,
+            deletable=self.deletable,
+            show_title=self.show_title,
+            title_url=self.title_url,
+            css_classes=list(self.css_classes) + ['placeholder'],
+            pre_content=message,
+        )
+        placeholder.id = self.id
+        placeholder._initialized = True
+        return placeholder
+
+    def get_cache_models(self):
+        """
+        Returns the labels of the models whose changes invalidate the cached
+        module.
+        """
+        return self.cache_models
+
+    def get_cache_state(self):
+        """
+        Returns the state built by ``init_with_context`` to be cached.
+        """
+        return dict((attr, getattr(self, attr)) for attr in self.cache_attributes)
+
+    def set_cache_state(self, state):
+        """
+        Restores a state returned by ``get_cache_state``.
+        """
+        for attr, value in state.items():
+            setattr(self, attr, value)
+        self._initialized = True
+
 
 class LinkList(DashboardModule):
     """
@@ -325,6 +401,7 @@ class AppList(DashboardModule, AppListElementMixin):
 
     title = _('Applications')
     template = 'client_admin/dashboard/modules/app_list.html'
+    cache_timeout = 60 * 5
     models = None
     exclude = None
     include_list = None
@@ -410,6 +487,7 @@ class ModelList(DashboardModule, AppListElementMixin):
     """
 
     template = 'client_admin/dashboard/modules/model_list.html'
+    cache_timeout = 60 * 5
     models = None
     exclude = None
     include_list = None
@@ -459,6 +537,10 @@ class RecentActions(DashboardModule):
     ``limit``
         The maximum number of children to display. Default value: 10.
 
+    ``before``
+        The id of a log entry; only older entries are listed. Used by the
+        module endpoint to load more actions. Default value: ``None``.
+
     Here's a small example of building a recent actions module::
 
         from client_admin.dashboard import modules, Dashboard
@@ -479,9 +561,15 @@ class RecentActions(DashboardModule):
     """
     title = _('Recent Actions')
     template = 'client_admin/dashboard/modules/recent_actions.html'
+    cache_timeout = 60 * 5
+    cache_models = ('admin.logentry',)
+    cache_attributes = DashboardModule.cache_attributes + ('has_more', 'next_before')
     limit = 10
     include_list = None
     exclude_list = None
+    before = None
+    has_more = False
+    next_before = None
 
     def __init__(self, title=None, limit=10, include_list=None,
                  exclude_list=None, **kwargs):
@@ -493,43 +581,14 @@ class RecentActions(DashboardModule):
     def init_with_context(self, context):
         if self._initialized:
             return
-        from django.db.models import Q
-        from django.contrib.admin.models import LogEntry
 
         request = context['request']
-
-        def get_qset(list):
-            qset = None
-            for contenttype in list:
-                if isinstance(contenttype, ContentType):
-                    current_qset = Q(content_type__id=contenttype.id)
-                else:
-                    try:
-                        app_label, model = contenttype.split('.')
-                    except:
-                        raise ValueError('Invalid contenttype: "%s"' % contenttype)
-                    current_qset = Q(
-                        content_type__app_label=app_label,
-                        content_type__model=model
-                    )
-                if qset is None:
-                    qset = current_qset
-                else:
-                    qset = qset | current_qset
-            return qset
-
-        if request.user is None:
-            qs = LogEntry.objects.all()
-        else:
-            qs = LogEntry.objects.filter(user__id__exact=request.user.id)
-
-        if self.include_list:
-            qs = qs.filter(get_qset(self.include_list))
-        if self.exclude_list:
-            qs = qs.exclude(get_qset(self.exclude_list))
-
-        self.children = qs.select_related('content_type', 'user')[:self.limit]
-        if not len(self.children):
+        timeline = ActionTimeline(self.include_list, self.exclude_list)
+        user_id = request.user.id if request.user is not None else None
+        self.children = timeline.page(self.limit, before=self.before, user_id=user_id)
+        self.has_more = len(self.children) >= self.limit
+        self.next_before = self.children[-1].id if self.has_more else None
+        if not len(self.children) and not self.before:
             self.pre_content = _('No recent actions.')
         self._initialized = True
 
@@ -556,6 +615,10 @@ class Feed(DashboardModule):
         The maximum number of feed children to display. Default value: None,
         which means that all children are displayed.
 
+    Feeds are fetched in the background by
+    :data:`~client_admin.feeds.feed_fetcher` and the module displays the
+    last snapshot it stored, so rendering never waits for the feed.
+
     Here's a small example of building a recent actions module::
 
         from client_admin.dashboard import modules, Dashboard
@@ -588,135 +651,324 @@ class Feed(DashboardModule):
     def init_with_context(self, context):
         if self._initialized:
             return
-        import datetime
         if self.feed_url is None:
             raise ValueError('You must provide a valid feed URL')
         try:
-            import feedparser
+            entries = feed_fetcher.entries(self.feed_url)
         except ImportError:
             self.children.append({
-                'title': ('You must install the FeedParser python module'),
+                'title': FEEDPARSER_MISSING,
                 'warning': True,
             })
             return
 
-        feed = feedparser.parse(self.feed_url)
-        if self.limit is not None:
-            entries = feed['entries'][:self.limit]
+        if entries is None:
+            self.pre_content = _('The feed is being loaded.')
+        elif self.limit is not None:
+            self.children = entries[:self.limit]
         else:
-            entries = feed['entries']
-        for entry in entries:
-            entry.url = entry.link
-            try:
-                entry.date = datetime.date(*entry.updated_parsed[0:3])
-            except:
-                # no date for certain feeds
-                pass
-            self.children.append(entry)
+            self.children = entries
         self._initialized = True
 
 
+def get_declared_cache_models():
+    """
+    Returns the ``cache_models`` declared by the dashboard module classes
+    defined so far, and the models of the ``CLIENT_ADMIN_SITEMAP`` menus.
+    """
+    labels = set()
+    classes = [DashboardModule]
+    while classes:
+        cls = classes.pop()
+        labels.update(cls.cache_models)
+        classes.extend(cls.__subclasses__())
+    labels.update(Sitemap().get_cache_models())
+    return labels
+
+
+def _child_model(model, child_query):
+    """
+    Returns the model ``child_query`` relates ``model`` to, or None when it
+    doesn't name a relation.
+    """
+    descriptor = getattr(model, child_query, None)
+    related = getattr(descriptor, 'related', None)
+    if related is not None:
+        # a reverse foreign key or many to many relation
+        return related.model
+    field = getattr(descriptor, 'field', None)
+    if field is not None and getattr(field, 'rel', None):
+        return field.rel.to
+    return None
+
+
 class Sitemap(DashboardModule, AppListElementMixin):
+    """
+    Module that displays the menus listed in the ``CLIENT_ADMIN_SITEMAP``
+    setting as a tree. The tree is loaded one level at a time: children are
+    prefetched for the whole level when ``CHILDREN`` names a relation, and
+    the objects menu items point to are fetched with one query per model.
+
+    ``max_depth``
+        Number of levels shown below each menu. Default value: ``None``
+        (unlimited).
+
+    ``max_nodes``
+        Maximum number of items in the tree. Items past the budget are left
+        out and a note is displayed. Default value: ``None`` (unlimited).
+    """
     template = 'client_admin/dashboard/modules/sitemap.html'
+    cache_timeout = 60 * 5
     admin_site = None
+    max_depth = None
+    max_nodes = None
+
+    def get_sitemap_settings(self):
+        return getattr(settings, 'CLIENT_ADMIN_SITEMAP', ({
+            'MODEL': 'structure.menu',
+            'ID': '1',
+            'CHILDREN': 'items',
+        },))
+
+    def get_cache_models(self):
+        labels = set()
+        for item_dict in self.get_sitemap_settings():
+            if not item_dict.get('MODEL'):
+                continue
+            app_label, class_name = item_dict['MODEL'].split('.')
+            try:
+                model = get_model(app_label, class_name)
+            except LookupError:
+                continue
+            child_query = item_dict.get('CHILDREN', None)
+            # the menu items below a root are nested through the same relation;
+            # the objects they point to expire with cache_timeout
+            while model is not None and model_label(model) not in labels:
+                labels.add(model_label(model))
+                model = _child_model(model, child_query) if child_query else None
+        return tuple(sorted(labels))
 
     def _get_admin_object_change_url(self, model, obj, context):
         """
         Returns the admin object change url.
         """
-        app_label = model._meta.app_label
-        return reverse('admin:%s_%s_change' % (app_label,
-                                                model.__name__.lower()), args=(obj.id,))
+        return get_admin_urls().change(model, obj.id)
 
-    def _sitemap_child(self, item_class, item_id, child_query, context, title=None):
-        item_dict = {}
-        item = None
+    def _get_perms(self, model):
+        """
+        Returns the admin permissions of the current user on ``model``, or
+        None if the model isn't registered.
+        """
+        return self._perms.get_model_perms(model)
+
+    def _fetch_objects(self, keys, child_query):
+        """
+        Fetches the objects identified by a list of ``(model, pk)`` keys with
+        one query per model and returns them in a dict keyed the same way.
+        """
+        grouped = {}
+        for model, pk in keys:
+            try:
+                grouped.setdefault(model, set()).add(model._meta.pk.to_python(pk))
+            except (ValueError, TypeError, ValidationError):
+                pass
+        objects = {}
+        for model, pks in grouped.items():
+            instances = list(model._default_manager.filter(pk__in=pks))
+            self._prefetch_children(instances, child_query)
+            for obj in instances:
+                objects[(model, obj.pk)] = obj
+        return objects
+
+    def _prefetch_children(self, instances, child_query):
+        """
+        Prefetches ``child_query`` on a list of instances of the same model
+        when it names a relation. Anything else, such as a method, is left to
+        be evaluated per object.
+        """
+        if not instances or not child_query:
+            return
+        model = instances[0].__class__
+        if (model, child_query) in self._not_prefetchable:
+            return
         try:
-            model_admin = self.admin_site._registry[item_class]
-            perms = model_admin.get_model_perms(context['request'])
-            if item_id:
-                try:
-                    item = item_class.objects.get(id=item_id)
-                    if perms['change']:
-                        item_dict['change_url'] = get_admin_object_change_url(item)
-                    item_dict['title'] = item.__unicode__()
-                    if child_query:
-                        # assuming this is a menu
-                        children = getattr(item, child_query, None)
-                        try:
-                            children = children()
-                        except TypeError:
-                            pass
-                        if children:
-                            subitems = []
-                            for child_item in children:
-                                subitems.append(self._menu_child(child_item, child_query, context))
-                            item_dict['children'] = subitems
-                    item_dict['type'] = item_class._meta.verbose_name
-                except item_class.DoesNotExist:
-                    pass
-            if not item:
-                if perms['change']:
-                    item_dict['list_url'] = get_admin_change_url(item_class)
-                if perms['add']:
-                    item_dict['add_url'] = get_admin_add_url(item_class)
-                item_dict['title'] = capfirst(item_class._meta.verbose_name_plural)
-        except KeyError:
+            prefetch_related_objects(instances, [child_query])
+        except (AttributeError, ValueError):
+            self._not_prefetchable.add((model, child_query))
+
+    def _get_children(self, item, child_query):
+        children = getattr(item, child_query, None)
+        if hasattr(children, 'get_queryset'):
+            # a related manager, possibly prefetched
+            return list(children.all())
+        try:
+            children = children()
+        except TypeError:
             pass
-        if title:
-            # Allow a title override
-            item_dict['title'] = title
-        return item_dict
+        return list(children or ())
 
-    def _menu_child(self, item, child_query, context):
+    def _model_dict(self, model, obj):
+        """
+        Returns the item dict of a model, or of one of its objects.
+        """
         item_dict = {}
-        try:
-            if item.content_type:
-                item_dict = self._sitemap_child(item.content_type.model_class(), item.object_id, child_query, context)
-        except ContentType.DoesNotExist:
-            pass
-        if child_query:
-            children = getattr(item, child_query, None)
-            try:
-                children = children()
-            except TypeError:
-                pass
-            if children:
-                subitems = []
-                for child_item in children:
-                    subitems.append(self._menu_child(child_item, child_query, context))
-                item_dict['children'] = subitems
-        item_dict['title'] = item.__unicode__()
+        perms = self._get_perms(model)
+        if perms is None:
+            return item_dict
+        if obj is not None:
+            if perms['change']:
+                item_dict['change_url'] = get_admin_object_change_url(obj)
+            item_dict['title'] = force_text(obj)
+            item_dict['type'] = model._meta.verbose_name
+        else:
+            if perms['change']:
+                item_dict['list_url'] = get_admin_change_url(model)
+            if perms['add']:
+                item_dict['add_url'] = get_admin_add_url(model)
+            item_dict['title'] = capfirst(model._meta.verbose_name_plural)
         return item_dict
 
+    def _take_node(self):
+        if self.max_nodes is not None and self._node_count >= self.max_nodes:
+            self._truncated = True
+            return False
+        self._node_count += 1
+        return True
+
+    def _expand_level(self, level, depth):
+        """
+        Attaches the children of every node in ``level`` and returns the
+        next level. A level is a list of ``(item_dict, sources, child_query)``
+        tuples; the children of the first source that has any are used.
+        """
+        menu_items = []
+        for item_dict, sources, child_query in level:
+            for source in sources:
+                children = self._get_children(source, child_query)
+                if children:
+                    break
+            else:
+                continue
+            subitems = []
+            for child_item in children:
+                if not self._take_node():
+                    break
+                child_dict = {}
+                subitems.append(child_dict)
+                menu_items.append((child_dict, child_item, child_query))
+            if subitems:
+                item_dict['children'] = subitems
+
+        # resolve the objects the menu items point to, grouped by model
+        targets = []
+        keys = {}
+        for child_dict, child_item, child_query in menu_items:
+            model = None
+            object_id = getattr(child_item, 'object_id', None)
+            content_type_id = getattr(child_item, 'content_type_id', None)
+            if content_type_id:
+                try:
+                    model = ContentType.objects.get_for_id(content_type_id).model_class()
+                except ContentType.DoesNotExist:
+                    pass
+            if model is not None and object_id:
+                keys.setdefault(child_query, []).append((model, object_id))
+            targets.append((model, object_id))
+        objects = {}
+        for child_query, query_keys in keys.items():
+            objects.update(self._fetch_objects(query_keys, child_query))
+
+        # the menu items themselves are prefetched per model as well
+        by_model = {}
+        for child_dict, child_item, child_query in menu_items:
+            by_model.setdefault((child_item.__class__, child_query), []).append(child_item)
+        for (model, child_query), instances in by_model.items():
+            self._prefetch_children(instances, child_query)
+
+        next_level = []
+        for (child_dict, child_item, child_query), (model, object_id) in zip(menu_items, targets):
+            sources = [child_item]
+            if model is not None:
+                obj = None
+                if object_id:
+                    try:
+                        obj = objects.get((model, model._meta.pk.to_python(object_id)))
+                    except (ValueError, TypeError, ValidationError):
+                        pass
+                child_dict.update(self._model_dict(model, obj))
+                if obj is not None and self._get_perms(model) is not None:
+                    sources.append(obj)
+            child_dict['title'] = force_text(child_item)
+            if child_query and (self.max_depth is None or depth < self.max_depth):
+                next_level.append((child_dict, sources, child_query))
+        return next_level
+
     def init_with_context(self, context):
         if self._initialized:
             return
 
         self.admin_site = admin.site
-        sitemap_dict = getattr(settings, 'CLIENT_ADMIN_SITEMAP', ({
-            'MODEL': 'structure.menu',
-            'ID': '1',
-            'CHILDREN': 'items',
-        },))
-        for item_dict in sitemap_dict:
+        self._request = context['request']
+        self._perms = get_permission_snapshot(self._request)
+        self._not_prefetchable = set()
+        self._node_count = 0
+        self._truncated = False
+
+        roots = []
+        for item_dict in self.get_sitemap_settings():
             app_label, class_name = item_dict.get('MODEL', '').split('.')
             item_class = get_model(app_label, class_name)
-            item_id = item_dict.get('ID', None)
-            child_query = item_dict.get('CHILDREN', None)
-            title = item_dict.get('TITLE', None)
-            self.children.append(self._sitemap_child(item_class, item_id, child_query, context, title))
+            roots.append((item_class, item_dict.get('ID', None), item_dict.get('CHILDREN', None), item_dict.get('TITLE', None)))
 
+        keys = {}
+        for item_class, item_id, child_query, title in roots:
+            if item_id:
+                keys.setdefault(child_query, []).append((item_class, item_id))
+        objects = {}
+        for child_query, query_keys in keys.items():
+            objects.update(self._fetch_objects(query_keys, child_query))
+
+        level = []
+        for item_class, item_id, child_query, title in roots:
+            obj = None
+            if item_id:
+                try:
+                    obj = objects.get((item_class, item_class._meta.pk.to_python(item_id)))
+                except (ValueError, TypeError, ValidationError):
+                    pass
+            root_dict = self._model_dict(item_class, obj)
+            if title:
+                # Allow a title override
+                root_dict['title'] = title
+            if obj is not None and child_query and self.max_depth != 0 and self._get_perms(item_class) is not None:
+                level.append((root_dict, [obj], child_query))
+            self.children.append(root_dict)
+
+        depth = 1
+        while level:
+            level = self._expand_level(level, depth)
+            depth += 1
+
+        if self._truncated:
+            self.post_content = _('Only the first %d items are shown.') % self.max_nodes
         self._initialized = True
 
 
 class AllRecentActions(DashboardModule):
     title = _('All Recent Actions')
     template = 'client_admin/dashboard/modules/recent_actions.html'
+    cache_timeout = 60 * 5
+    cache_models = ('admin.logentry',)
+    cache_attributes = DashboardModule.cache_attributes + ('current_user', 'has_more', 'next_before')
     limit = 10
     include_list = None
     exclude_list = None
     current_user = None
+    # "<mine>-<others>": the last entry shown of the current user and of
+    # the others, empty once a side has no more entries
+    before = None
+    has_more = False
+    next_before = None
 
     def __init__(self, title=None, limit=10, include_list=None,
                  exclude_list=None, **kwargs):
@@ -728,54 +980,37 @@ class AllRecentActions(DashboardModule):
     def init_with_context(self, context):
         if self._initialized:
             return
-        from django.db.models import Q
-        from django.contrib.admin.models import LogEntry
-
-        def get_qset(list):
-            qset = None
-            for contenttype in list:
-                if isinstance(contenttype, ContentType):
-                    current_qset = Q(content_type__id=contenttype.id)
-                else:
-                    try:
-                        app_label, model = contenttype.split('.')
-                    except:
-                        raise ValueError('Invalid contenttype: "%s"' % contenttype)
-                    current_qset = Q(
-                        content_type__app_label=app_label,
-                        content_type__model=model
-                    )
-                if qset is None:
-                    qset = current_qset
-                else:
-                    qset = qset | current_qset
-            return qset
-
-        qs = LogEntry.objects.all()
-
-        if self.include_list:
-            qs = qs.filter(get_qset(self.include_list))
-        if self.exclude_list:
-            qs = qs.exclude(get_qset(self.exclude_list))
         if context['request'] and context['request'].user:
             self.current_user = context['request'].user.id
 
-        mine = qs.filter(user=self.current_user).select_related('content_type', 'user')[:self.limit]
-        others = qs.exclude(user=self.current_user).select_related('content_type', 'user')[:self.limit]
-        self.children = list(mine)+list(others)
-        if LogEntry._meta.ordering:
-            order = LogEntry._meta.ordering[0]
-            if order[0] == '-':
-                self.children.sort(key=lambda x: getattr(x, order[1:]))
-                self.children.reverse()
-            else:
-                self.children.sort(key=lambda x: getattr(x, order))
-        if not len(self.children):
+        timeline = ActionTimeline(self.include_list, self.exclude_list)
+        # the current user's entries and the others' are paged separately,
+        # so that neither side skips entries of the other
+        if self.before:
+            mine_before, sep, others_before = self.before.partition('-')
+            self.children = timeline.window(
+                self.current_user, self.limit, mine_before=mine_before or None, others_before=others_before or None,
+                mine=bool(mine_before), others=bool(others_before))
+        else:
+            self.children = timeline.window(self.current_user, self.limit)
+        mine = [entry.id for entry in self.children if entry.user_id == self.current_user]
+        others = [entry.id for entry in self.children if entry.user_id != self.current_user]
+        next_mine = mine[-1] if len(mine) >= self.limit else ''
+        next_others = others[-1] if len(others) >= self.limit else ''
+        self.has_more = bool(next_mine or next_others)
+        self.next_before = '%s-%s' % (next_mine, next_others) if self.has_more else None
+        if not len(self.children) and not self.before:
             self.pre_content = _('No recent actions.')
         self._initialized = True
 
 
 class MemcachedStatus(DashboardModule):
+    """
+    Module that displays the statistics of every memcached server, as
+    sampled in the background by
+    :data:`~client_admin.cachestats.cache_stats_collector`, along with
+    sparklines of their recent history.
+    """
     title = _('Memcached Status')
     template = 'client_admin/dashboard/modules/memcache_status.html'
 
@@ -784,16 +1019,22 @@ class MemcachedStatus(DashboardModule):
             return
 
         cache_stats = []
-        for cache_backend_nm, cache_backend_attrs in settings.CACHES.iteritems():
-            try:
-                cache_backend = get_cache(cache_backend_nm)
-                this_backend_stats = cache_backend._cache.get_stats()
-                # returns list of (name, stats) tuples
-                for server_name, server_stats in this_backend_stats:
-                    cache_stats.append(("%s: %s" % (
-                        cache_backend_nm, server_name), server_stats))
-            except AttributeError:  # this backend probably doesn't support that
-                continue
+        # list of (name, stats, trends) tuples
+        for server_name, server_stats in cache_stats_collector.latest():
+            cache_stats.append((server_name, server_stats, self.get_trends(server_name)))
         self.children = cache_stats
         if not len(self.children):
             self.pre_content = _('No memcached statuses.')
+        self._initialized = True
+
+    def get_trends(self, server_name):
+        history = cache_stats_collector.history
+        load = ratio_series(history(server_name, 'bytes'), history(server_name, 'limit_maxbytes'))
+        misses = ratio_series(history(server_name, 'get_misses'), history(server_name, 'cmd_get'))
+        gets = rate_series(history(server_name, 'cmd_get'))
+        return {
+            'load': sparkline_points(load),
+            'miss_ratio': sparkline_points(misses),
+            'get_rate': sparkline_points(gets),
+            'current_get_rate': gets[-1] if gets else None,
+        }
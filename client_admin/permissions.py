@@ -0,0 +1,123 @@
+# Copyright 2013 Concentric Sky, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Permissions of the current user, computed once per request.
+"""
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.auth import get_permission_codename
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import Permission
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+from client_admin.cache import permission_fingerprint
+
+PERMISSION_METHODS = ('get_model_perms', 'has_add_permission', 'has_change_permission', 'has_delete_permission')
+
+
+def _uses_model_backend_only():
+    backends = getattr(settings, 'AUTHENTICATION_BACKENDS', ())
+    return bool(backends) and all(import_string(path) is ModelBackend for path in backends)
+
+
+def _uses_default_permissions(model_admin):
+    # admins that override a permission method decide for themselves
+    cls = model_admin.__class__
+    return all(getattr(cls, name).__func__ is getattr(admin.ModelAdmin, name).__func__
+               for name in PERMISSION_METHODS)
+
+
+class PermissionSnapshot(object):
+    """
+    The admin permissions of ``request.user``. The user's full permission
+    set is loaded on first use, with a single query when ``ModelBackend`` is
+    the only authentication backend, and per model permissions are derived
+    from it. Use :func:`get_permission_snapshot` to share one snapshot
+    between everything that renders during a request.
+    """
+
+    def __init__(self, request, site=None):
+        self.request = request
+        self.user = request.user
+        self.site = site or admin.site
+        self._perms = None
+        self._model_perms = {}
+
+    def get_all_permissions(self):
+        """
+        Returns the set of "app_label.codename" permissions of the user.
+        """
+        if self._perms is None:
+            user = self.user
+            if not user.is_active or user.is_anonymous():
+                self._perms = set()
+            elif _uses_model_backend_only() and not user.is_superuser:
+                perms = Permission.objects.filter(Q(user=user) | Q(group__user=user)).values_list(
+                    'content_type__app_label', 'codename').distinct()
+                self._perms = set('%s.%s' % (ct, name) for ct, name in perms)
+                # ModelBackend reads this on has_perm
+                user._perm_cache = self._perms
+            else:
+                self._perms = user.get_all_permissions()
+        return self._perms
+
+    def has_perm(self, perm):
+        if self.user.is_active and self.user.is_superuser:
+            return True
+        return perm in self.get_all_permissions()
+
+    def has_module_perms(self, app_label):
+        if self.user.is_active and self.user.is_superuser:
+            return True
+        prefix = '%s.' % app_label
+        return any(perm.startswith(prefix) for perm in self.get_all_permissions())
+
+    def get_model_perms(self, model):
+        """
+        Returns the ``{'add', 'change', 'delete'}`` permissions of ``model``
+        like ``ModelAdmin.get_model_perms``, or None if the model isn't
+        registered with the admin site.
+        """
+        if model not in self._model_perms:
+            model_admin = self.site._registry.get(model)
+            if model_admin is None:
+                perms = None
+            elif not _uses_default_permissions(model_admin):
+                perms = model_admin.get_model_perms(self.request)
+            else:
+                opts = model._meta
+                perms = dict(
+                    (action, self.has_perm('%s.%s' % (opts.app_label, get_permission_codename(action, opts))))
+                    for action in ('add', 'change', 'delete')
+                )
+            self._model_perms[model] = perms
+        return self._model_perms[model]
+
+    def fingerprint(self):
+        if not self.user.is_active or self.user.is_superuser:
+            return permission_fingerprint(self.user)
+        return permission_fingerprint(self.user, self.get_all_permissions())
+
+
+def get_permission_snapshot(request):
+    """
+    Returns the permission snapshot of ``request``, creating it on first use.
+    """
+    try:
+        return request._client_admin_permissions
+    except AttributeError:
+        request._client_admin_permissions = PermissionSnapshot(request)
+        return request._client_admin_permissions
@@ -543,5 +543,21 @@
         }
         return parseInt(max_forms);
     };
+
+    // Nested inlines below the admin's lazy_inline_depth are loaded on demand;
+    // the fragment carries its own management form and formset script.
+    $(document).on('click', '.lazy-recursive-inline-load', function(e) {
+        e.preventDefault();
+        var $placeholder = $(this).closest('.lazy-recursive-inline');
+        if ($placeholder.hasClass('loading')) {
+            return;
+        }
+        $placeholder.addClass('loading');
+        $.get($placeholder.data('url'), function(html) {
+            $placeholder.replaceWith(html);
+        }).fail(function() {
+            $placeholder.removeClass('loading');
+        });
+    });
  })(django.jQuery);
 
@@ -13,7 +13,7 @@ var init_dashboard = function(id, columns, preferences, url) {
 
     $ = jQuery;
 
-    $(".activity-types a").click(function(e){
+    $('#'+id).on('click', '.activity-types a', function(e){
         $(".activity-types a").removeClass('active');
         $(this).addClass('active');
         var filter = $(this).attr('data-filter');
@@ -21,9 +21,48 @@ var init_dashboard = function(id, columns, preferences, url) {
         items.each(function(i){
             var visible = (filter == 'mine' && $(this).hasClass('mine') )
                 ||  (filter == 'others' && !$(this).hasClass('mine') )
-                ||  (filter == 'all' && i < 10);
+                ||  (filter == 'all' && (i < 10 || $(this).hasClass('more')));
             $(this).toggle(visible);
         });
         e.preventDefault();
     });
+
+    $('#'+id).on('click', '.activity-more a', function(e){
+        var more = $(this).parent();
+        jQuery.get($(this).attr('href'), function(html) {
+            var fragment = jQuery('<div/>').html(html);
+            more.prev('ul').append(fragment.find('li.more'));
+            var next = fragment.find('.activity-more');
+            if (next.length) {
+                more.replaceWith(next);
+            } else {
+                more.remove();
+            }
+        });
+        e.preventDefault();
+    });
+
+    // deferred modules are fetched once they are shown
+    $('#'+id).find('.dashboard-module[data-deferred-eager]').each(function() {
+        load_deferred_module($(this));
+    });
+    $('#'+id).on('click', 'h3 a.toggle-icon', function() {
+        load_deferred_module($(this).closest('.dashboard-module'));
+    });
+    $(document).on('click', '.dashboard-module-add, .add-dashboard-module', function() {
+        load_deferred_module($('#' + $(this).attr('rel')));
+    });
+};
+
+var load_deferred_module = function(module) {
+    var url = module.attr('data-deferred-url');
+    if (!url) {
+        return;
+    }
+    module.removeAttr('data-deferred-url');
+    jQuery.get(url, function(html) {
+        var content = jQuery('<div/>').html(html).find('.dashboard-module-content');
+        module.removeClass('placeholder');
+        module.children('.dashboard-module-content').html(content.length ? content.html() : '');
+    });
 };
@@ -156,19 +156,21 @@
                         content_type: that.cID
                     },
                     success: function(data) {
-                        var item = data[0];
-                        if (item && item.content_type_text && item.object_text) {
-                            $('#unicode_'+that.object_input.id).text(item.object_text);
-                            // run a callback to do other stuff like prepopulating url fields
-                            // can't be done with normal django admin prepopulate
-                            if (that.updateObjectDataCallback) {
-                                that.updateObjectDataCallback(item);
-                            }
-                        }
+                        that.setObjectData(data[0]);
                     }
                 });
             };
         },
+        setObjectData: function(item) {
+            if (item && item.content_type_text && item.object_text) {
+                $('#unicode_'+this.object_input.id).text(item.object_text);
+                // run a callback to do other stuff like prepopulating url fields
+                // can't be done with normal django admin prepopulate
+                if (this.updateObjectDataCallback) {
+                    this.updateObjectDataCallback(item);
+                }
+            }
+        },
 
         updateObjectLookup: function(elem){
             var that = this;
@@ -209,7 +211,13 @@
                 if ($(this.object_input).val()) {
                     // If both type and id exist, look up the obj and update the obj data
                     that.updateObjectLookup($(that.object_select)[0]);
-                    this.updateObjectData()();
+                    if (that.batchLookups) {
+                        // resolved together with the other rows on the page
+                        $('#unicode_' + that.object_input.id).text('loading...');
+                        pendingLookups.push(that);
+                    } else {
+                        this.updateObjectData()();
+                    }
                 } else {
                     // run a full change event on object_select
                     $(this.object_select).trigger('change');
@@ -222,6 +230,31 @@
         },
     };
 
+    // Rows present on page load are looked up with a single request
+    var pendingLookups = [];
+
+    var flushPendingLookups = function() {
+        var lookups = pendingLookups;
+        pendingLookups = [];
+        if (!lookups.length) {
+            return;
+        }
+        $.ajax({
+            url: GenericAdmin.obj_url,
+            dataType: 'json',
+            traditional: true,
+            data: {
+                content_type: $.map(lookups, function(lookup) { return lookup.cID; }),
+                object_id: $.map(lookups, function(lookup) { return lookup.object_input.value; })
+            },
+            success: function(data) {
+                $.each(lookups, function(i, lookup) {
+                    lookup.setObjectData(data[i]);
+                });
+            }
+        });
+    };
+
     install_on_add = function(i, e) {
         inputs = i.find("input[id$='object_id']")
         //$.extend({}, GenericAdmin).installAdmin(this_input);
@@ -232,10 +265,11 @@
 
     $(document).ready(function() {
         $("li:not(.empty-form) input[id$='object_id']").each(function(i, e) {
-            $.extend({}, GenericAdmin).installAdmin(this);
+            $.extend({}, GenericAdmin, {batchLookups: true}).installAdmin(this);
         });
         $("tr:not(.empty-form) input[id$='object_id']").each(function(i, e) {
-            $.extend({}, GenericAdmin).installAdmin(this);
+            $.extend({}, GenericAdmin, {batchLookups: true}).installAdmin(this);
         });
+        flushPendingLookups();
     });
 } (django.jQuery));
@@ -17,14 +17,14 @@ from __future__ import unicode_literals
 import datetime
 
 from django.contrib.admin.util import (lookup_field, display_for_field,
-    display_for_value, label_for_field)
+    display_for_value, label_for_field, quote)
 from django.contrib.admin.views.main import (ALL_VAR, EMPTY_CHANGELIST_VALUE,
-    ORDER_VAR, PAGE_VAR, SEARCH_VAR)
+    ORDER_VAR, PAGE_VAR, SEARCH_VAR, ChangeList)
 from django.contrib.admin.templatetags.admin_static import static
 from django.core.exceptions import ObjectDoesNotExist
 from django.db import models
 from django.utils import formats
-from django.utils.html import format_html
+from django.utils.html import conditional_escape, escape, format_html
 from django.utils.safestring import mark_safe
 from django.utils import six
 from django.utils.text import capfirst
@@ -34,6 +34,9 @@ from django.template import Library
 from django.template.loader import get_template
 from django.template.context import Context
 
+from client_admin.adminurls import get_admin_urls
+from client_admin.datehierarchy import DateHistogram
+
 register = Library()
 
 DOT = '.'
@@ -260,6 +263,139 @@ def items_for_result(cl, result, form):
     if form and not form[cl.model._meta.pk.name].is_hidden:
         yield format_html('<td>{0}</td>', force_text(form[cl.model._meta.pk.name]))
 
+class _Column(object):
+    # what RowRenderer knows about a list_display entry before the first row
+    def __init__(self, name, link, tag):
+        self.name = name
+        self.link = link
+        self.tag = tag
+        self.field = None
+        self.func = None
+        self.allow_tags = False
+        self.boolean = False
+        self.row_class = ''
+
+
+class RowRenderer(object):
+    """
+    Renders changelist rows like ``items_for_result``. Each column's field or
+    display function, CSS class, tag and link behaviour are resolved once per
+    ChangeList instead of once per cell. Use :func:`get_row_renderer` to get
+    the renderer of a ChangeList.
+    """
+
+    def __init__(self, cl):
+        self.cl = cl
+        self.pk_name = cl.model._meta.pk.name
+        self.id_attname = str(cl.to_field) if cl.to_field else cl.lookup_opts.pk.attname
+        # ChangeList subclasses may link rows elsewhere
+        self.fast_urls = getattr(cl.__class__.url_for_result, '__func__', None) is ChangeList.url_for_result.__func__
+        self.columns = []
+        first = True
+        for field_name in cl.list_display:
+            link = (first and not cl.list_display_links) or field_name in cl.list_display_links
+            column = _Column(field_name, link, 'th' if first else 'td')
+            if link:
+                first = False
+            self._resolve(column)
+            self.columns.append(column)
+
+    def _resolve(self, column):
+        name = column.name
+        model_admin = self.cl.model_admin
+        try:
+            if not isinstance(name, six.string_types):
+                raise models.FieldDoesNotExist
+            column.field = self.cl.lookup_opts.get_field(name)
+        except models.FieldDoesNotExist:
+            if callable(name):
+                column.func = name
+            elif hasattr(model_admin, name) and name not in ('__str__', '__unicode__'):
+                column.func = getattr(model_admin, name)
+            if name == 'action_checkbox':
+                column.row_class = mark_safe(' class="action-checkbox"')
+            if column.func is not None:
+                column.boolean = getattr(column.func, 'boolean', False)
+                column.allow_tags = getattr(column.func, 'allow_tags', False) or column.boolean
+        else:
+            if isinstance(column.field, (models.DateField, models.TimeField, models.ForeignKey)):
+                column.row_class = mark_safe(' class="nowrap"')
+
+    def _display(self, column, result):
+        # the display value and CSS class of a cell, as items_for_result has them
+        f = column.field
+        if f is not None:
+            value = getattr(result, column.name)
+            if isinstance(f.rel, models.ManyToOneRel):
+                return EMPTY_CHANGELIST_VALUE if value is None else value, column.row_class
+            return display_for_field(value, f), column.row_class
+        if column.func is not None:
+            attr = column.func
+            value = attr(result)
+            allow_tags, boolean = column.allow_tags, column.boolean
+        else:
+            attr = getattr(result, column.name)
+            value = attr() if callable(attr) else attr
+            boolean = getattr(attr, 'boolean', False)
+            allow_tags = getattr(attr, 'allow_tags', False) or boolean
+        result_repr = display_for_value(value, boolean)
+        if allow_tags:
+            result_repr = mark_safe(result_repr)
+        if isinstance(value, (datetime.date, datetime.time)):
+            return result_repr, mark_safe(' class="nowrap"')
+        return result_repr, column.row_class
+
+    def url_for_result(self, result):
+        cl = self.cl
+        if self.fast_urls:
+            return get_admin_urls(cl.model_admin.admin_site).change(cl.model, quote(getattr(result, cl.pk_attname)))
+        return cl.url_for_result(result)
+
+    def render(self, result, form=None):
+        """
+        Returns the list of cells of ``result``'s row.
+        """
+        cells = []
+        for column in self.columns:
+            try:
+                result_repr, row_class = self._display(column, result)
+            except ObjectDoesNotExist:
+                result_repr, row_class = EMPTY_CHANGELIST_VALUE, column.row_class
+            if not isinstance(result_repr, six.string_types):
+                result_repr = force_text(result_repr)
+            if result_repr == '':
+                result_repr = mark_safe('&nbsp;')
+            if column.link:
+                if self.cl.is_popup:
+                    # Convert the pk to something that can be used in Javascript.
+                    result_id = repr(force_text(result.serializable_value(self.id_attname)))[1:]
+                    onclick = format_html(""" onclick=\"opener.dismissRelatedLookupPopup(window, {0}, \'{1}\'); return false;\"""", result_id, six.text_type(result_repr).replace("'", ""))
+                else:
+                    onclick = ''
+                cells.append(mark_safe('<%s%s><a href="%s"%s>%s</a></%s>' % (
+                    column.tag, row_class, escape(self.url_for_result(result)), onclick,
+                    conditional_escape(result_repr), column.tag)))
+                continue
+            if (form and column.name in form.fields and not (
+                    column.name == self.pk_name and form[self.pk_name].is_hidden)):
+                bf = form[column.name]
+                result_repr = mark_safe(force_text(bf.errors) + force_text(bf))
+            cells.append(mark_safe('<td%s>%s</td>' % (row_class, conditional_escape(result_repr))))
+        if form and not form[self.pk_name].is_hidden:
+            cells.append(format_html('<td>{0}</td>', force_text(form[self.pk_name])))
+        return cells
+
+
+def get_row_renderer(cl):
+    """
+    Returns the row renderer of ``cl``, creating it on first use.
+    """
+    try:
+        return cl._client_admin_row_renderer
+    except AttributeError:
+        cl._client_admin_row_renderer = RowRenderer(cl)
+        return cl._client_admin_row_renderer
+
 class ResultList(list):
     # Wrapper class used to return items in a list_editable
     # changelist, annotated with the form object for error
@@ -270,12 +406,13 @@ class ResultList(list):
         super(ResultList, self).__init__(*items)
 
 def results(cl):
+    renderer = get_row_renderer(cl)
     if cl.formset:
         for res, form in zip(cl.result_list, cl.formset.forms):
-            yield ResultList(form, items_for_result(cl, res, form))
+            yield ResultList(form, renderer.render(res, form))
     else:
         for res in cl.result_list:
-            yield ResultList(None, items_for_result(cl, res, None))
+            yield ResultList(None, renderer.render(res))
 
 def result_hidden_fields(cl):
     if cl.formset:
@@ -315,16 +452,16 @@ def date_hierarchy(cl):
         day_lookup = cl.params.get(day_field)
 
         link = lambda d: cl.get_query_string(d, [field_generic])
+        histogram = DateHistogram(cl)
 
         if not (year_lookup or month_lookup or day_lookup):
             # select appropriate start level
-            date_range = cl.query_set.aggregate(first=models.Min(field_name),
-                                                last=models.Max(field_name))
-            if date_range['first'] and date_range['last']:
-                if date_range['first'].year == date_range['last'].year:
-                    year_lookup = date_range['first'].year
-                    if date_range['first'].month == date_range['last'].month:
-                        month_lookup = date_range['first'].month
+            years = histogram.buckets('year')
+            if len(years) == 1:
+                year_lookup = years[0][0].year
+                months = histogram.buckets('month', year_lookup)
+                if len(months) == 1:
+                    month_lookup = months[0][0].month
 
         if year_lookup and month_lookup and day_lookup:
             day = datetime.date(int(year_lookup), int(month_lookup), int(day_lookup))
@@ -334,10 +471,13 @@ def date_hierarchy(cl):
                     'link': link({year_field: year_lookup, month_field: month_lookup}),
                     'title': capfirst(formats.date_format(day, 'YEAR_MONTH_FORMAT'))
                 },
-                'choices': [{'title': capfirst(formats.date_format(day, 'MONTH_DAY_FORMAT'))}]
+                'choices': [{
+                    'title': capfirst(formats.date_format(day, 'MONTH_DAY_FORMAT')),
+                    'count': cl.result_count,
+                }]
             }
         elif year_lookup and month_lookup:
-            days = cl.query_set.filter(**{year_field: year_lookup, month_field: month_lookup}).dates(field_name, 'day')
+            days = histogram.buckets('day', year_lookup, month_lookup)
             return {
                 'show': True,
                 'back': {
@@ -346,11 +486,12 @@ def date_hierarchy(cl):
                 },
                 'choices': [{
                     'link': link({year_field: year_lookup, month_field: month_lookup, day_field: day.day}),
-                    'title': capfirst(formats.date_format(day, 'MONTH_DAY_FORMAT'))
-                } for day in days]
+                    'title': capfirst(formats.date_format(day, 'MONTH_DAY_FORMAT')),
+                    'count': count,
+                } for day, count in days]
             }
         elif year_lookup:
-            months = cl.query_set.filter(**{year_field: year_lookup}).dates(field_name, 'month')
+            months = histogram.buckets('month', year_lookup)
             return {
                 'show' : True,
                 'back': {
@@ -359,17 +500,19 @@ def date_hierarchy(cl):
                 },
                 'choices': [{
                     'link': link({year_field: year_lookup, month_field: month.month}),
-                    'title': capfirst(formats.date_format(month, 'YEAR_MONTH_FORMAT'))
-                } for month in months]
+                    'title': capfirst(formats.date_format(month, 'YEAR_MONTH_FORMAT')),
+                    'count': count,
+                } for month, count in months]
             }
         else:
-            years = cl.query_set.dates(field_name, 'year')
+            years = histogram.buckets('year')
             return {
                 'show': True,
                 'choices': [{
                     'link': link({year_field: str(year.year)}),
                     'title': str(year.year),
-                } for year in years]
+                    'count': count,
+                } for year, count in years]
             }
 
 
@@ -27,14 +27,15 @@ except ImportError:
 
 # django imports
 from django import template
-from django.contrib.contenttypes.models import ContentType
 from django.utils.formats import get_format
 from django.utils.safestring import mark_safe
 from django.db import models
 from django.contrib import admin
-from django.core.urlresolvers import reverse
 from django.conf import settings
 
+from client_admin.adminurls import get_admin_urls
+from client_admin.contenttypes import content_type_serializer
+
 register = template.Library()
 
 
@@ -45,11 +46,7 @@ class do_get_generic_objects(template.Node):
         pass
     
     def render(self, context):
-        return_string = "{"
-        for c in ContentType.objects.all().order_by('id'):
-            return_string = "%s%s: {pk: %s, app: '%s', model: '%s'}," % (return_string, c.id, c.id, c.app_label, c.model)
-        return_string = "%s}" % return_string[:-1]
-        return return_string
+        return content_type_serializer.as_json('objects')[0]
 
 def get_content_types(parser, token):
     """
@@ -224,14 +221,12 @@ def get_autocomplete_lookup_fields_generic(model_admin):
 @register.filter
 def get_admin_object_change_url(obj):
     if obj:
-        info = obj._meta.app_label, obj._meta.model_name
-        return reverse('admin:%s_%s_change' % info, args=(obj.pk,))
+        return get_admin_urls().change(obj.__class__, obj.pk)
     return None
 
 
 @register.filter
 def get_admin_object_add_url(obj):
     if obj:
-        info = obj._meta.app_label, obj._meta.model_name
-        return reverse('admin:%s_%s_add' % info)
+        return get_admin_urls().add(obj.__class__)
     return None
@@ -29,11 +29,11 @@ class CrewInline(admin.StackedInline):
 class MissionInline(admin.TabularInline):
     model = Mission
 
-class StarshipInline(client_admin.StackedRecursiveInline):
+class StarshipInline(client_admin.StackedInline):
     model = Starship
     inlines = [CrewInline, MissionInline]
 
-class QuadrantInline(client_admin.StackedRecursiveInline):
+class QuadrantInline(client_admin.StackedInline):
     model = Quadrant
     inlines = [PlanetInline]
 
@@ -41,6 +41,29 @@ class FederationAdmin(client_admin.RecursiveInlinesModelAdmin):
     model = Federation
     inlines = [QuadrantInline, StarshipInline]
 
+class CrewAdmin(admin.ModelAdmin):
+    list_display = ('name', 'starshp', 'rank_and_name', 'is_captain', '__str__')
+
+    def rank_and_name(self, obj):
+        return '<b>%s</b> %s' % (obj.rank, obj.name)
+
+    def is_captain(self, obj):
+        return obj.rank == 'Captain'
+    is_captain.boolean = True
+
 site = admin.AdminSite(name="admin")
 site.register(Federation, FederationAdmin)
+site.register(Crew, CrewAdmin)
+
+class LazyFederationAdmin(FederationAdmin):
+    lazy_inline_depth = 1
+
+lazy_site = admin.AdminSite(name="lazyadmin")
+lazy_site.register(Federation, LazyFederationAdmin)
+
+class ClientFederationAdmin(client_admin.ClientModelAdmin):
+    model = Federation
+    inlines = [QuadrantInline, StarshipInline]
 
+client_site = admin.AdminSite(name="clientadmin")
+client_site.register(Federation, ClientFederationAdmin)
@@ -15,10 +15,15 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from django import forms
+from django.forms.models import BaseInlineFormSet, inlineformset_factory
 from django.test import TestCase
+from django.test.client import RequestFactory
 from django.contrib.auth.models import User, Permission
 from django.test.utils import override_settings
 
+from client_admin.admin import MediaCollector, formset_tree_changed
+
 from .admin import *
 from .models import *
 
@@ -185,3 +190,324 @@ class TestRecursiveInline(TestCase):
         self.assertEqual(Quadrant.objects.filter(name='Zeta').count(), 1)
         self.assertEqual(Starship.objects.filter(name='Avenger').count(), 1)
 
+
+class RecursiveInlineTestCase(TestCase):
+    fixtures = ['admin-views-users.xml', 'federation.xml']
+
+    def setUp(self):
+        self.model_admin = site._registry[Federation]
+
+    def get_request(self, method='get', path='/', data=None):
+        request = getattr(RequestFactory(), method)(path, data or {})
+        request.user = User.objects.get(username='super')
+        return request
+
+
+class TestInlinePlans(RecursiveInlineTestCase):
+
+    def test_plans_are_computed_once_per_request(self):
+        request = self.get_request()
+        plans = self.model_admin.get_inline_plans(request, QuadrantInline(Federation, site))
+        self.assertEqual([plan.inline.__class__ for plan in plans], [PlanetInline])
+        self.assertTrue(self.model_admin.get_inline_plans(request, QuadrantInline(Federation, site)) is plans)
+        self.assertFalse(self.model_admin.get_inline_plans(self.get_request(), QuadrantInline(Federation, site)) is plans)
+
+    def test_plans_of_every_inline(self):
+        request = self.get_request()
+        plans = self.model_admin.get_inline_plans(request, StarshipInline(Federation, site))
+        self.assertEqual([plan.inline.__class__ for plan in plans], [CrewInline, MissionInline])
+        self.assertEqual(plans[0].FormSet.fk.name, 'starshp')
+
+    def test_plain_inlines_have_no_plans(self):
+        self.assertEqual(self.model_admin.get_inline_plans(self.get_request(), PlanetInline(Quadrant, site)), [])
+
+    def test_plans_per_parent(self):
+        class PlanetPerQuadrantInline(PlanetInline):
+            def get_extra(self, request, obj=None, **kwargs):
+                return obj.pk if obj else 0
+
+        class QuadrantPlanetsInline(QuadrantInline):
+            inlines = [PlanetPerQuadrantInline]
+
+        request = self.get_request()
+        plan = self.model_admin.get_inline_plans(request, QuadrantPlanetsInline(Federation, site))[0]
+        self.assertTrue(plan.depends_on_obj)
+        self.assertEqual(plan.FormSet.extra, 0)
+        quadrant = Quadrant.objects.get(pk=2)
+        quadrant_plan = self.model_admin.get_inline_plan(request, plan, quadrant)
+        self.assertEqual(quadrant_plan.obj, quadrant)
+        self.assertEqual(quadrant_plan.FormSet.extra, 2)
+        self.assertTrue(self.model_admin.get_inline_plan(request, plan, quadrant) is quadrant_plan)
+
+    def test_plans_without_parent_are_shared(self):
+        request = self.get_request()
+        plan = self.model_admin.get_inline_plans(request, QuadrantInline(Federation, site))[0]
+        self.assertFalse(plan.depends_on_obj)
+        self.assertTrue(self.model_admin.get_inline_plan(request, plan, Quadrant.objects.get(pk=1)) is plan)
+
+
+class TestInlineChildren(RecursiveInlineTestCase):
+
+    def test_one_query_per_level(self):
+        plan = self.model_admin.get_inline_plans(self.get_request(), QuadrantInline(Federation, site))[0]
+        quadrants = list(Quadrant.objects.order_by('pk'))
+        with self.assertNumQueries(1):
+            grouped = self.model_admin.get_inline_children(plan, quadrants)
+            names = dict((key, [planet.name for planet in planets]) for key, planets in grouped.items())
+            # the parents are attached to their children
+            self.assertEqual(grouped[1][0].quadrant, quadrants[0])
+        self.assertEqual(names, {1: ['Earth', 'Omicron Persei 8'], 2: [u"Qo'noS"]})
+
+    def test_parents_without_children(self):
+        gamma = Quadrant.objects.create(name='Gamma', federation_id=1)
+        plan = self.model_admin.get_inline_plans(self.get_request(), QuadrantInline(Federation, site))[0]
+        self.assertEqual(self.model_admin.get_inline_children(plan, [gamma]), {gamma.pk: []})
+
+    def test_nested_formsets_share_the_level_query(self):
+        request = self.get_request()
+        federation = Federation.objects.get(pk=1)
+        inline = QuadrantInline(Federation, site)
+        formset = inline.get_formset(request, federation)(instance=federation, queryset=inline.get_queryset(request))
+        forms = list(formset.forms)
+        self.model_admin.get_inline_plans(request, inline)
+        with self.assertNumQueries(1):
+            self.model_admin.add_recursive_inline_formsets(request, inline, formset, federation)
+        self.assertEqual([[planet.name for planet in form.recursive_formsets[0].get_queryset()] for form in forms],
+                         [['Earth', 'Omicron Persei 8'], [u"Qo'noS"]])
+
+
+class TestUnchangedSubtrees(RecursiveInlineTestCase):
+
+    def get_formset(self, **changes):
+        data = {
+            'quadrant_set-TOTAL_FORMS' : '2',
+            'quadrant_set-INITIAL_FORMS' : '2',
+            'quadrant_set-0-id' : '1',
+            'quadrant_set-0-federation' : '1',
+            'quadrant_set-0-name' : 'Alpha',
+            'quadrant_set-0-planet_set-TOTAL_FORMS' : '2',
+            'quadrant_set-0-planet_set-INITIAL_FORMS' : '2',
+            'quadrant_set-0-planet_set-0-id' : '1',
+            'quadrant_set-0-planet_set-0-quadrant' : '1',
+            'quadrant_set-0-planet_set-0-name' : 'Earth',
+            'quadrant_set-0-planet_set-1-id' : '2',
+            'quadrant_set-0-planet_set-1-quadrant' : '1',
+            'quadrant_set-0-planet_set-1-name' : 'Omicron Persei 8',
+            'quadrant_set-1-id' : '2',
+            'quadrant_set-1-federation' : '1',
+            'quadrant_set-1-name' : 'Beta',
+            'quadrant_set-1-planet_set-TOTAL_FORMS' : '1',
+            'quadrant_set-1-planet_set-INITIAL_FORMS' : '1',
+            'quadrant_set-1-planet_set-0-id' : '3',
+            'quadrant_set-1-planet_set-0-quadrant' : '2',
+            'quadrant_set-1-planet_set-0-name' : 'Qo\'noS',
+        }
+        data.update(changes)
+        self.request = self.get_request('post', data=data)
+        federation = Federation.objects.get(pk=1)
+        inline = QuadrantInline(Federation, site)
+        formset = inline.get_formset(self.request, federation)(self.request.POST, self.request.FILES, instance=federation,
+                                                                queryset=inline.get_queryset(self.request))
+        self.model_admin.add_recursive_inline_formsets(self.request, inline, formset, federation)
+        return formset
+
+    def test_unchanged_tree_is_skipped(self):
+        formset = self.get_formset()
+        self.assertFalse(formset_tree_changed(formset))
+        self.assertTrue(self.model_admin.all_valid([formset]))
+        with self.assertNumQueries(0):
+            self.model_admin.save_formset(self.request, None, formset, change=True)
+        self.assertEqual(formset.new_objects, [])
+        self.assertEqual(formset.changed_objects, [])
+
+    def test_nested_change_is_saved(self):
+        formset = self.get_formset(**{'quadrant_set-1-planet_set-0-name': 'Kronos'})
+        self.assertTrue(formset_tree_changed(formset))
+        self.assertFalse(formset_tree_changed(formset.forms[0].recursive_formsets[0]))
+        self.assertTrue(self.model_admin.all_valid([formset]))
+        self.model_admin.save_formset(self.request, None, formset, change=True)
+        self.assertEqual(Planet.objects.get(pk=3).name, 'Kronos')
+
+
+@override_settings(PASSWORD_HASHERS=('django.contrib.auth.hashers.SHA1PasswordHasher',))
+class TestLazyRecursiveInline(TestCase):
+    urls = 'client_admin.tests.recursiveinlines.urls'
+    fixtures = ['admin-views-users.xml', 'federation.xml']
+    inline_url = '/lazyadmin/recursiveinlines/federation/%s/recursive-inline/'
+
+    def setUp(self):
+        result = self.client.login(username='super', password='secret')
+        self.assertEqual(result, True)
+
+    def tearDown(self):
+        self.client.logout()
+
+    def test_view(self):
+        response = self.client.get('/lazyadmin/recursiveinlines/federation/1/')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '<div class="inline-group" id="quadrant_set-group">')
+        self.assertContains(response, 'id="quadrant_set-0-planet_set-lazy"')
+        self.assertContains(response, 'recursive-inline/?')
+        self.assertNotContains(response, 'Omicron Persei 8')
+        self.assertNotContains(response, 'Jean-Luc Picard')
+
+    def test_load(self):
+        response = self.client.get(self.inline_url % 1, {
+            'inline': 'QuadrantInline/PlanetInline',
+            'parent': '1',
+            'prefix': 'quadrant_set-0-planet_set',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'quadrant_set-0-planet_set-TOTAL_FORMS')
+        self.assertContains(response, 'Omicron Persei 8')
+        self.assertNotContains(response, 'Qo&#39;noS')
+
+    def test_load_parent_of_another_object(self):
+        empire = Federation.objects.create(name='Klingon Empire')
+        response = self.client.get(self.inline_url % empire.pk, {
+            'inline': 'QuadrantInline/PlanetInline',
+            'parent': '1',
+            'prefix': 'quadrant_set-0-planet_set',
+        })
+        self.assertEqual(response.status_code, 404)
+
+    def test_load_unknown_inline(self):
+        response = self.client.get(self.inline_url % 1, {
+            'inline': 'QuadrantInline/CrewInline',
+            'parent': '1',
+            'prefix': 'quadrant_set-0-crew_set',
+        })
+        self.assertEqual(response.status_code, 404)
+
+    def test_edit_keeps_unloaded_levels(self):
+        data = {
+            'name' : 'United Federation of Planets',
+            'quadrant_set-TOTAL_FORMS' : '2',
+            'quadrant_set-INITIAL_FORMS' : '2',
+            'quadrant_set-0-id' : '1',
+            'quadrant_set-0-federation' : '1',
+            'quadrant_set-0-name' : 'Alpha',
+            'quadrant_set-1-id' : '2',
+            'quadrant_set-1-federation' : '1',
+            'quadrant_set-1-name' : 'Beta Quadrant',
+            'starship_set-TOTAL_FORMS' : '2',
+            'starship_set-INITIAL_FORMS' : '2',
+            'starship_set-0-id' : '1',
+            'starship_set-0-federation' : '1',
+            'starship_set-0-name' : 'Enterprise',
+            'starship_set-1-id' : '2',
+            'starship_set-1-federation' : '1',
+            'starship_set-1-name' : 'Planet Express Ship',
+        }
+        planets, crew = Planet.objects.count(), Crew.objects.count()
+
+        response = self.client.post('/lazyadmin/recursiveinlines/federation/1/', data)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Quadrant.objects.get(pk=2).name, 'Beta Quadrant')
+        self.assertEqual(Planet.objects.count(), planets)
+        self.assertEqual(Crew.objects.count(), crew)
+
+
+class TestMediaCollector(TestCase):
+
+    def test_paths_are_kept_once_in_order(self):
+        collector = MediaCollector(forms.Media(js=['a.js', 'b.js'], css={'all': ['a.css']}))
+        collector.add(forms.Media(js=['b.js', 'c.js'], css={'all': ['a.css', 'b.css'], 'print': ['a.css']}))
+        media = collector.get_media()
+        self.assertEqual(media._js, ['a.js', 'b.js', 'c.js'])
+        self.assertEqual(media._css, {'all': ['a.css', 'b.css'], 'print': ['a.css']})
+
+    def test_inline_media_is_collected_once_per_class(self):
+        class InlineAdminFormSet(object):
+            def __init__(self, opts, media):
+                self.opts, self.media = opts, media
+        collector = MediaCollector()
+        collector.add_inline(InlineAdminFormSet(PlanetInline(Quadrant, site), forms.Media(js=['planet.js'])))
+        collector.add_inline(InlineAdminFormSet(PlanetInline(Quadrant, site), forms.Media(js=['other.js'])))
+        collector.add_inline(InlineAdminFormSet(CrewInline(Starship, site), forms.Media(js=['crew.js'])))
+        self.assertEqual(collector.get_media()._js, ['planet.js', 'crew.js'])
+
+
+class TestValidationReport(RecursiveInlineTestCase):
+
+    def get_formset(self, crew_data):
+        data = {
+            'starship_set-TOTAL_FORMS' : '2',
+            'starship_set-INITIAL_FORMS' : '2',
+            'starship_set-0-id' : '1',
+            'starship_set-0-federation' : '1',
+            'starship_set-0-name' : 'Enterprise',
+            'starship_set-1-id' : '2',
+            'starship_set-1-federation' : '1',
+            'starship_set-1-name' : 'Planet Express Ship',
+            'starship_set-0-crew_set-TOTAL_FORMS' : str(len(crew_data)),
+            'starship_set-0-crew_set-INITIAL_FORMS' : '0',
+        }
+        for i, (name, rank) in enumerate(crew_data):
+            data['starship_set-0-crew_set-%d-name' % i] = name
+            data['starship_set-0-crew_set-%d-rank' % i] = rank
+        formset = inlineformset_factory(Federation, Starship, extra=0)(data, instance=Federation.objects.get(pk=1))
+        for form in formset.forms:
+            form.recursive_formsets = []
+        enterprise = formset.forms[0]
+        enterprise.recursive_formsets = [
+            inlineformset_factory(Starship, Crew, extra=0)(data, instance=enterprise.instance, prefix='starship_set-0-crew_set'),
+        ]
+        return formset
+
+    def test_errors_of_the_tree(self):
+        formset = self.get_formset([('Wesley Crusher', ''), ('Worf', 'Lieutenant'), ('', 'Ensign')])
+        report = self.model_admin.validate_formsets([formset])
+        self.assertFalse(report.is_valid)
+        self.assertEqual([entry['prefix'] for entry in report],
+                         ['starship_set-0-crew_set-0', 'starship_set-0-crew_set-2'])
+        self.assertEqual(report.entries[0]['name'], Crew._meta.verbose_name)
+        self.assertTrue('rank' in report.entries[0]['errors'])
+        self.assertTrue('name' in report.entries[1]['errors'])
+        self.assertFalse(self.model_admin.all_valid([formset]))
+
+    def test_valid_tree(self):
+        formset = self.get_formset([('Worf', 'Lieutenant')])
+        report = self.model_admin.validate_formsets([formset])
+        self.assertTrue(report.is_valid)
+        self.assertEqual(len(report), 0)
+
+    def test_unchanged_top_level_formsets_are_cleaned(self):
+        class RequiredQuadrantFormSet(BaseInlineFormSet):
+            def clean(self):
+                if not any(form.has_changed() for form in self.forms):
+                    raise forms.ValidationError('A federation needs a quadrant.')
+        data = {
+            'quadrant_set-TOTAL_FORMS' : '1',
+            'quadrant_set-INITIAL_FORMS' : '0',
+            'quadrant_set-0-name' : '',
+        }
+        FormSet = inlineformset_factory(Federation, Quadrant, formset=RequiredQuadrantFormSet, extra=1)
+        formset = FormSet(data, instance=Federation())
+        formset.forms[0].recursive_formsets = []
+        self.assertFalse(formset_tree_changed(formset))
+        report = self.model_admin.validate_formsets([formset])
+        self.assertFalse(report.is_valid)
+        self.assertEqual([entry['prefix'] for entry in report], ['quadrant_set'])
+        self.assertEqual(list(report.entries[0]['errors']), ['A federation needs a quadrant.'])
+
+
+@override_settings(PASSWORD_HASHERS=('django.contrib.auth.hashers.SHA1PasswordHasher',))
+class TestClientModelAdminRecursiveInline(TestCase):
+    urls = 'client_admin.tests.recursiveinlines.urls'
+    fixtures = ['admin-views-users.xml', 'federation.xml']
+
+    def setUp(self):
+        result = self.client.login(username='super', password='secret')
+        self.assertEqual(result, True)
+
+    def tearDown(self):
+        self.client.logout()
+
+    def test_view(self):
+        # raw id values are collected from the wrapped nested formsets
+        response = self.client.get('/clientadmin/recursiveinlines/federation/1/')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '<div class="inline-group" id="quadrant_set-group">')
+        self.assertContains(response, 'Omicron Persei 8')
+        self.assertContains(response, 'Jean-Luc Picard')
@@ -19,4 +19,6 @@ from . import admin
 
 urlpatterns = patterns('',
     (r'^admin/', include(admin.site.urls)),
+    (r'^lazyadmin/', include(admin.lazy_site.urls)),
+    (r'^clientadmin/', include(admin.client_site.urls)),
 )
@@ -0,0 +1,72 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright 2013 Concentric Sky, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from django.contrib.admin.options import IS_POPUP_VAR
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.test.client import RequestFactory
+from django.utils.encoding import force_text
+
+from client_admin.benchmarks import benchmark_rows, get_changelist
+from client_admin.templatetags.admin_list import RowRenderer, get_row_renderer, items_for_result, results
+
+from .recursiveinlines.admin import site
+from .recursiveinlines.models import Crew
+
+
+class TestRowRenderer(TestCase):
+    urls = 'client_admin.tests.recursiveinlines.urls'
+    fixtures = ['admin-views-users.xml', 'federation.xml']
+
+    def get_changelist(self, data=None):
+        request = RequestFactory().get('/admin/recursiveinlines/crew/', data or {})
+        request.user = User.objects.get(username='super')
+        return get_changelist(request, Crew, site)
+
+    def assertRendersLikeItemsForResult(self, cl):
+        renderer = RowRenderer(cl)
+        self.assertEqual(len(cl.result_list), Crew.objects.count())
+        for result in cl.result_list:
+            self.assertEqual([force_text(cell) for cell in renderer.render(result)],
+                             [force_text(cell) for cell in items_for_result(cl, result, None)])
+
+    def test_rows(self):
+        self.assertRendersLikeItemsForResult(self.get_changelist())
+
+    def test_popup_rows(self):
+        cl = self.get_changelist({IS_POPUP_VAR: '1'})
+        self.assertTrue(cl.is_popup)
+        self.assertRendersLikeItemsForResult(cl)
+
+    def test_escaping(self):
+        cl = self.get_changelist()
+        cells = RowRenderer(cl).render(Crew.objects.get(pk=1))
+        self.assertTrue('&lt;b&gt;Captain&lt;/b&gt; Jean-Luc Picard' in cells[3])
+        self.assertTrue('icon-yes.gif' in cells[4])
+
+    def test_one_renderer_per_changelist(self):
+        cl = self.get_changelist()
+        renderer = get_row_renderer(cl)
+        self.assertTrue(get_row_renderer(cl) is renderer)
+        self.assertEqual(len(list(results(cl))), Crew.objects.count())
+        self.assertTrue(get_row_renderer(cl) is renderer)
+        self.assertFalse(get_row_renderer(self.get_changelist()) is renderer)
+
+    def test_benchmark(self):
+        timings = benchmark_rows(self.get_changelist(), repeat=1)
+        self.assertEqual(timings['rows'], Crew.objects.count())
+        self.assertEqual(timings['cells'], timings['rows'] * 6)
@@ -0,0 +1,111 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright 2013 Concentric Sky, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.test.client import RequestFactory
+
+from client_admin.admin import ClientModelAdmin
+from client_admin.benchmarks import get_changelist
+from client_admin.changelist import ListQueryPlan
+
+from .recursiveinlines.admin import site
+from .recursiveinlines.models import Crew
+
+
+def ship_missions(obj):
+    return ', '.join(mission.content for mission in obj.starshp.mission_set.all())
+ship_missions.relations = 'starshp__mission_set'
+
+
+def federation(obj):
+    return obj.starshp.federation.name
+federation.admin_order_field = 'starshp__federation__name'
+
+
+class TestListQueryPlan(TestCase):
+    fixtures = ['federation.xml']
+
+    def get_plan(self, list_display):
+        return ListQueryPlan(site._registry[Crew], list_display)
+
+    def test_plain_fields(self):
+        plan = self.get_plan(['name', 'rank'])
+        self.assertEqual(plan.select_related, [])
+        self.assertEqual(plan.prefetch_related, [])
+
+    def test_foreign_keys_follow_their_required_foreign_keys(self):
+        plan = self.get_plan(['name', 'starshp'])
+        self.assertEqual(plan.select_related, ['starshp__federation'])
+        self.assertEqual(plan.prefetch_related, [])
+
+    def test_admin_order_field(self):
+        self.assertEqual(self.get_plan(['name', federation]).select_related, ['starshp__federation'])
+
+    def test_reverse_relations_are_prefetched(self):
+        plan = self.get_plan([ship_missions])
+        self.assertEqual(plan.select_related, [])
+        self.assertEqual(plan.prefetch_related, ['starshp__mission_set'])
+
+    def test_reverse_relations_by_query_name(self):
+        def missions(obj):
+            return obj.starshp.mission_set.count()
+        missions.admin_order_field = 'starshp__mission__content'
+        plan = self.get_plan([missions])
+        self.assertEqual(plan.select_related, [])
+        self.assertEqual(plan.prefetch_related, ['starshp__mission_set'])
+
+    def test_queries(self):
+        plan = self.get_plan(['name', 'starshp', federation])
+        with self.assertNumQueries(1):
+            names = [federation(member) for member in plan.apply(Crew.objects.all())]
+        self.assertEqual(set(names), set(['United Federation of Planets']))
+
+
+class ProjectedCrewAdmin(ClientModelAdmin):
+    list_display = ('name', 'starshp')
+    list_projection = True
+
+
+class TestListProjection(TestCase):
+    fixtures = ['admin-views-users.xml', 'federation.xml']
+
+    def get_changelist(self, **options):
+        projection_site = admin.AdminSite(name='projection')
+        projection_site.register(Crew, ProjectedCrewAdmin, **options)
+        self.request = RequestFactory().get('/admin/recursiveinlines/crew/')
+        self.request.user = User.objects.get(username='super')
+        return get_changelist(self.request, Crew, projection_site)
+
+    def test_page_is_projected(self):
+        cl = self.get_changelist()
+        self.assertEqual(cl.list_projection, ['id', 'name', 'starshp'])
+        self.assertTrue(all(member._deferred for member in cl.result_list))
+        self.assertEqual(cl.result_list[0].starshp.federation.name, 'United Federation of Planets')
+
+    def test_queryset_is_not_projected(self):
+        # actions get full objects
+        cl = self.get_changelist()
+        self.assertFalse(any(member._deferred for member in cl.get_queryset(self.request)))
+
+    def test_str_needs_a_field_list(self):
+        cl = self.get_changelist(list_display=('__str__', 'starshp'))
+        self.assertFalse(hasattr(cl, 'list_projection'))
+        self.assertFalse(any(member._deferred for member in cl.result_list))
+        cl = self.get_changelist(list_display=('__str__', 'starshp'), list_projection=['name', 'rank'])
+        self.assertEqual(cl.list_projection, ['id', 'name', 'rank', 'starshp'])
@@ -0,0 +1,76 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright 2013 Concentric Sky, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import get_cache
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from client_admin.contenttypes import GenericRelRegistry, content_types_migrated
+
+from .recursiveinlines.models import Planet
+
+
+@override_settings(CACHES={'client_admin_tests': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                                  'LOCATION': 'client_admin_contenttypes'}},
+                   CLIENT_ADMIN_CACHE='client_admin_tests')
+class TestGenericRelRegistry(TestCase):
+
+    def setUp(self):
+        get_cache('client_admin_tests').clear()
+        self.registry = GenericRelRegistry()
+
+    def get_labels(self, **kwargs):
+        content = self.registry.get_payload('admin', **kwargs)[0]
+        return sorted(label for label, params in json.loads(content).values())
+
+    def test_whitelist(self):
+        planet = ContentType.objects.get_for_model(Planet)
+        content, etag = self.registry.get_payload('admin', whitelist=['recursiveinlines/planet'])
+        self.assertEqual(json.loads(content), {str(planet.id): ['recursiveinlines/planet', {}]})
+
+    def test_equivalent_lists_share_a_payload(self):
+        self.assertEqual(self.get_labels(whitelist=['recursiveinlines/planet']), ['recursiveinlines/planet'])
+        # whitelists from request.GET are strings
+        self.assertEqual(self.get_labels(whitelist='recursiveinlines/planet'), ['recursiveinlines/planet'])
+        self.assertEqual(self.get_labels(whitelist='recursiveinlines/planet,unknown/model'), ['recursiveinlines/planet'])
+        self.assertEqual(len(self.registry._payloads._data), 1)
+
+    def test_blacklist(self):
+        labels = self.get_labels(blacklist=['recursiveinlines/planet'])
+        self.assertFalse('recursiveinlines/planet' in labels)
+        self.assertTrue('recursiveinlines/quadrant' in labels)
+
+    @override_settings(CLIENT_ADMIN_GENERIC_REL_CACHE_SIZE=2)
+    def test_size_is_bounded(self):
+        self.registry = GenericRelRegistry()
+        for model in ('planet', 'quadrant', 'starship', 'crew'):
+            self.get_labels(whitelist=['recursiveinlines/%s' % model])
+            self.assertTrue(len(self.registry._payloads._data) <= 2)
+
+    def test_migrated_content_types(self):
+        self.assertFalse('recursiveinlines/comet' in self.get_labels())
+        # migrate creates content types without sending post_save
+        ContentType.objects.bulk_create([ContentType(app_label='recursiveinlines', model='comet', name='comet')])
+        self.assertFalse('recursiveinlines/comet' in self.get_labels())
+        content_types_migrated()
+        self.assertTrue('recursiveinlines/comet' in self.get_labels())
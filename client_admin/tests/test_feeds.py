@@ -0,0 +1,194 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright 2013 Concentric Sky, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import BaseHTTPServer
+import SocketServer
+import socket
+import threading
+import time
+import unittest
+import urllib2
+
+from django.core.cache import get_cache
+from django.test import SimpleTestCase
+from django.test.utils import override_settings
+
+from client_admin import feeds
+from client_admin.feeds import FEEDPARSER_MISSING, FeedFetcher, _snapshot_key, feedparser
+from client_admin.modules import Feed
+
+
+FEED = """<?xml version="1.0" encoding="utf-8"?>
+<rss version="2.0">
+  <channel>
+    <title>Release notes</title>
+    <link>http://example.com/</link>
+    <description>Release notes</description>
+    <item>
+      <title>Version 1.1</title>
+      <link>http://example.com/1.1/</link>
+      <pubDate>Tue, 02 Jul 2013 10:00:00 GMT</pubDate>
+    </item>
+    <item>
+      <title>Version 1.0</title>
+      <link>http://example.com/1.0/</link>
+      <pubDate>Mon, 03 Jun 2013 10:00:00 GMT</pubDate>
+    </item>
+  </channel>
+</rss>
+"""
+
+ETAG = '"release-notes-1"'
+
+
+class FeedHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """
+    Serves ``/feed.xml`` with an ETag, ``/slow.xml`` after a delay longer
+    than the fetcher's timeout and ``/broken.xml`` as text that isn't a
+    feed. Requests are recorded on the server.
+    """
+
+    def do_GET(self):
+        self.server.requests.append((self.path, dict(self.headers)))
+        if self.path == '/feed.xml':
+            if self.headers.get('If-None-Match') == ETAG:
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.send_feed(FEED, ETAG)
+        elif self.path == '/slow.xml':
+            time.sleep(self.server.delay)
+            self.send_feed(FEED)
+        elif self.path == '/broken.xml':
+            self.send_feed('Service unavailable <<<')
+        else:
+            self.send_error(404)
+
+    def send_feed(self, content, etag=None):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/rss+xml')
+        self.send_header('Content-Length', str(len(content)))
+        if etag:
+            self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FeedServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+    delay = 1
+
+
+@unittest.skipIf(feedparser is None, 'feedparser is not installed')
+@override_settings(CACHES={'client_admin_tests': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                                  'LOCATION': 'client_admin_feeds'}},
+                   CLIENT_ADMIN_CACHE='client_admin_tests')
+class TestFeedFetcher(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super(TestFeedFetcher, cls).setUpClass()
+        cls.server = FeedServer(('127.0.0.1', 0), FeedHandler)
+        cls.server.requests = []
+        cls.thread = threading.Thread(target=cls.server.serve_forever)
+        cls.thread.daemon = True
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super(TestFeedFetcher, cls).tearDownClass()
+
+    def setUp(self):
+        get_cache('client_admin_tests').clear()
+        self.server.requests[:] = []
+        self.fetcher = FeedFetcher(timeout=0.25)
+
+    def url(self, path):
+        return 'http://127.0.0.1:%d%s' % (self.server.server_address[1], path)
+
+    def test_refresh(self):
+        url = self.url('/feed.xml')
+        snapshot = self.fetcher.refresh(url)
+        self.assertEqual([entry['title'] for entry in snapshot['entries']], ['Version 1.1', 'Version 1.0'])
+        self.assertEqual(snapshot['entries'][0]['url'], 'http://example.com/1.1/')
+        self.assertEqual(snapshot['etag'], ETAG)
+        self.assertEqual(self.fetcher.get_snapshot(url), snapshot)
+
+    def test_not_modified(self):
+        url = self.url('/feed.xml')
+        snapshot = self.fetcher.refresh(url)
+        self.assertEqual(self.fetcher.refresh(url), snapshot)
+        path, headers = self.server.requests[-1]
+        self.assertEqual(headers.get('if-none-match'), ETAG)
+
+    def test_timeout(self):
+        url = self.url('/slow.xml')
+        self.assertRaises((socket.timeout, urllib2.URLError), self.fetcher.refresh, url)
+        self.assertEqual(self.fetcher.get_snapshot(url), None)
+
+    def test_timeout_in_background(self):
+        # run() logs the failure and goes on with the other feeds
+        slow_url, url = self.url('/slow.xml'), self.url('/feed.xml')
+        self.fetcher._urls.update([slow_url, url])
+        self.fetcher.run()
+        self.assertEqual(self.fetcher.get_snapshot(slow_url), None)
+        self.assertEqual(len(self.fetcher.get_snapshot(url)['entries']), 2)
+
+    def test_malformed(self):
+        url = self.url('/broken.xml')
+        self.assertEqual(self.fetcher.refresh(url), None)
+        self.assertEqual(self.fetcher.get_snapshot(url), None)
+
+    def test_malformed_keeps_last_snapshot(self):
+        url = self.url('/broken.xml')
+        snapshot = {'entries': [{'title': 'Version 1.0', 'url': 'http://example.com/1.0/'}],
+                    'etag': None, 'modified': None, 'fetched': time.time()}
+        get_cache('client_admin_tests').set(_snapshot_key(url), snapshot)
+        self.assertEqual(self.fetcher.refresh(url), snapshot)
+        self.assertEqual(self.fetcher.get_snapshot(url), snapshot)
+
+
+@override_settings(CACHES={'client_admin_tests': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                                  'LOCATION': 'client_admin_feeds'}},
+                   CLIENT_ADMIN_CACHE='client_admin_tests')
+class TestWithoutFeedparser(SimpleTestCase):
+
+    def setUp(self):
+        self.feedparser = feeds.feedparser
+        feeds.feedparser = None
+        self.fetcher = FeedFetcher(timeout=0.25)
+
+    def tearDown(self):
+        feeds.feedparser = self.feedparser
+
+    def test_fetcher(self):
+        url = 'http://127.0.0.1:1/feed.xml'
+        self.fetcher.register(url)
+        self.assertEqual(self.fetcher._urls, set())
+        self.assertEqual(self.fetcher._thread, None)
+        self.assertRaises(ImportError, self.fetcher.refresh, url)
+        self.assertRaises(ImportError, self.fetcher.entries, url)
+
+    def test_module(self):
+        module = Feed(feed_url='http://127.0.0.1:1/feed.xml')
+        module.init_with_context({})
+        self.assertEqual(module.children, [{'title': FEEDPARSER_MISSING, 'warning': True}])
@@ -0,0 +1,62 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright 2013 Concentric Sky, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase
+
+from client_admin.utils import get_generic_objects
+from client_admin.views import get_objs
+
+from .recursiveinlines.models import Planet, Starship
+
+
+class TestGenericObjects(TestCase):
+    fixtures = ['federation.xml']
+
+    def setUp(self):
+        self.planet = ContentType.objects.get_for_model(Planet)
+        self.starship = ContentType.objects.get_for_model(Starship)
+        self.unknown_id = ContentType.objects.order_by('-pk')[0].pk + 100
+
+    def test_order_is_kept(self):
+        pairs = [(self.planet.id, 3), (self.starship.id, '1'), (self.planet.id, '1'), (self.starship.id, 2)]
+        # one query per model, whatever the order of the pairs
+        with self.assertNumQueries(2):
+            resolved = get_generic_objects(pairs)
+        self.assertEqual([(content_type, unicode(obj)) for content_type, obj in resolved],
+                         [(self.planet, u"Qo'noS"), (self.starship, u'Enterprise'),
+                          (self.planet, u'Earth'), (self.starship, u'Planet Express Ship')])
+
+    def test_unknown_content_type(self):
+        pairs = [(self.unknown_id, 1), ('planet', 1), (self.planet.id, 2)]
+        self.assertEqual(get_generic_objects(pairs),
+                         [(None, None), (None, None), (self.planet, Planet.objects.get(pk=2))])
+
+    def test_missing_object(self):
+        pairs = [(self.planet.id, 404), (self.planet.id, 'earth'), (self.planet.id, 1)]
+        self.assertEqual(get_generic_objects(pairs),
+                         [(self.planet, None), (self.planet, None), (self.planet, Planet.objects.get(pk=1))])
+
+    def test_lookup_dicts(self):
+        pairs = [(str(self.starship.id), '2'), (str(self.unknown_id), '1'), (str(self.planet.id), '404')]
+        self.assertEqual(get_objs(pairs), [
+            {'content_type_id': str(self.starship.id), 'object_id': '2', 'content_type_text': unicode(self.starship),
+             'object_text': u'Planet Express Ship', 'object_url': ''},
+            {'content_type_id': str(self.unknown_id), 'object_id': '1', 'content_type_text': u'', 'object_text': u''},
+            {'content_type_id': str(self.planet.id), 'object_id': '404', 'content_type_text': unicode(self.planet),
+             'object_text': u''},
+        ])
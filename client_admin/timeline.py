@@ -0,0 +1,143 @@
+# Copyright 2013 Concentric Sky, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Queries behind the recent actions dashboard modules.
+"""
+from django.contrib.admin.models import LogEntry
+from django.contrib.contenttypes.models import ContentType
+from django.db import connections
+from django.db.models import Q
+from django.db.models.sql.datastructures import EmptyResultSet
+
+from client_admin.contenttypes import GenerationCache
+
+_content_type_ids = GenerationCache()
+
+
+def get_content_type_ids(content_types):
+    """
+    Returns the ids of a list of content types, given either as ContentType
+    instances or as "app_label.model" strings. Unknown content types are
+    skipped. Results are memoized until a ContentType changes.
+    """
+    def build():
+        ids = []
+        for content_type in content_types:
+            if isinstance(content_type, ContentType):
+                ids.append(content_type.id)
+                continue
+            try:
+                app_label, model = content_type.split('.')
+            except:
+                raise ValueError('Invalid contenttype: "%s"' % content_type)
+            try:
+                ids.append(ContentType.objects.get_by_natural_key(app_label, model).id)
+            except ContentType.DoesNotExist:
+                pass
+        return tuple(ids)
+
+    key = tuple(c.id if isinstance(c, ContentType) else c for c in content_types)
+    return _content_type_ids.get(key, build)
+
+
+class ActionTimeline(object):
+    """
+    Reads LogEntry rows newest first, limited to the content types of
+    ``include_list`` and without those of ``exclude_list``. Content types are
+    filtered by id, so queries don't join ``django_content_type``.
+    """
+    ordering = ('-action_time', '-id')
+
+    def __init__(self, include_list=None, exclude_list=None):
+        self.include_list = include_list or []
+        self.exclude_list = exclude_list or []
+
+    def get_queryset(self):
+        qs = LogEntry.objects.all()
+        if self.include_list:
+            qs = qs.filter(content_type__id__in=get_content_type_ids(self.include_list))
+        if self.exclude_list:
+            exclude_ids = get_content_type_ids(self.exclude_list)
+            if exclude_ids:
+                qs = qs.exclude(content_type__id__in=exclude_ids)
+        return qs.order_by(*self.ordering)
+
+    def window(self, user_id, limit, mine_before=None, others_before=None, mine=True, others=True):
+        """
+        Returns up to ``limit`` entries of ``user_id`` and up to ``limit``
+        entries of other users, merged newest first, with a single query.
+        Each branch can start after its own entry (``mine_before`` and
+        ``others_before``) or be left out (``mine`` and ``others``).
+        """
+        qs = self.get_queryset()
+        branches = []
+        if mine:
+            branches.append(self._older_than(qs.filter(user__id=user_id), mine_before))
+        if others:
+            branches.append(self._older_than(qs.exclude(user__id=user_id), others_before))
+        selects, params = [], []
+        for branch in branches:
+            if branch is None:
+                continue
+            try:
+                sql, branch_params = branch.values('id')[:limit].query.get_compiler(using=qs.db).as_sql()
+            except EmptyResultSet:
+                # none of the included content types exist
+                continue
+            selects.append('SELECT id FROM (%s) branch%d' % (sql, len(selects)))
+            params.extend(branch_params)
+        if not selects:
+            return []
+        qn = connections[qs.db].ops.quote_name
+        where = '%s.%s IN (%s)' % (
+            qn(LogEntry._meta.db_table), qn(LogEntry._meta.pk.column), ' UNION ALL '.join(selects))
+        entries = LogEntry.objects.using(qs.db).extra(
+            where=[where],
+            params=params,
+        ).order_by(*self.ordering).select_related('user')
+        return self._with_content_types(entries)
+
+    def page(self, limit, before=None, user_id=None):
+        """
+        Returns up to ``limit`` entries older than the entry whose id is
+        ``before``, optionally restricted to ``user_id``.
+        """
+        qs = self.get_queryset()
+        if user_id is not None:
+            qs = qs.filter(user__id=user_id)
+        qs = self._older_than(qs, before)
+        if qs is None:
+            return []
+        return self._with_content_types(qs.select_related('user')[:limit])
+
+    def _older_than(self, qs, before):
+        # keyset on (action_time, id); None if the entry doesn't exist
+        if before is None:
+            return qs
+        try:
+            action_time = LogEntry.objects.using(qs.db).values_list('action_time', flat=True).get(pk=before)
+        except (LogEntry.DoesNotExist, ValueError):
+            return None
+        return qs.filter(Q(action_time__lt=action_time) | Q(action_time=action_time, id__lt=before))
+
+    def _with_content_types(self, entries):
+        # content types come from the ContentType cache instead of a join
+        entries = list(entries)
+        for entry in entries:
+            try:
+                entry._content_type_cache = ContentType.objects.get_for_id(entry.content_type_id)
+            except ContentType.DoesNotExist:
+                pass
+        return entries
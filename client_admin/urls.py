@@ -28,8 +28,10 @@ urlpatterns = patterns(
     url(r'^menu/remove_bookmark/(?P<id>.+)/$', client_admin_views.remove_bookmark, name='client-admin-menu-remove-bookmark'),
 
     url(r'^dashboard/set_preferences/(?P<dashboard_id>.+)/$', client_admin_views.set_preferences, name='client-admin-dashboard-set-preferences'),
+    url(r'^dashboard/module/(?P<dashboard_id>[^/]+)/(?P<module_id>[^/]+)/$', client_admin_views.dashboard_module, name='client-admin-dashboard-module'),
 
     url(r'^obj/$', client_admin_views.generic_lookup, name='admin_genericadmin_obj_lookup'),
+    url(r'^content-types\.js$', client_admin_views.content_types_js, name='client_admin_content_types_js'),
     #url(r'^get-generic-rel-list/$', client_admin_views.get_generic_rel_list, name='admin_genericadmin_rel_list'),
 
     url(r'^$', client_admin_views.dashboard, name='client_admin_dashboard'),
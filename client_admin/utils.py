@@ -15,12 +15,18 @@
 """
 Admin ui common utilities.
 """
-from fnmatch import fnmatch
+import re
+from fnmatch import translate
 
 from django.db.models.base import ModelBase
 from django.conf import settings
 from django.contrib import admin
-from django.core.urlresolvers import reverse, resolve
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ValidationError
+from django.core.urlresolvers import resolve
+
+from client_admin.adminurls import get_admin_urls
+from client_admin.permissions import get_permission_snapshot
 
 
 def uniquify(value, seen_values):
@@ -35,69 +41,134 @@ def uniquify(value, seen_values):
 
 
 def get_admin_object_change_url(obj):
-    info = obj._meta.app_label, obj._meta.model_name
-    return reverse('admin:%s_%s_change' % info, args=(obj.id,))
+    return get_admin_urls().change(obj.__class__, obj.id)
 
 
 def get_admin_app_list_url(model):
-    return reverse('admin:app_list', args=(model._meta.app_label,))
+    return get_admin_urls().app_list(model)
 
 
 def get_admin_change_url(model):
-    return reverse('admin:%s_%s_changelist' % (
-        model._meta.app_label,
-        model.__name__.lower()))
+    return get_admin_urls().changelist(model)
 
 
 def get_admin_add_url(model):
-    return reverse('admin:%s_%s_add' % (
-        model._meta.app_label,
-        model.__name__.lower()))
+    return get_admin_urls().add(model)
+
+
+def get_generic_objects(pairs):
+    """
+    Resolves a list of ``(content_type_id, object_id)`` pairs and returns a
+    list of ``(content_type, obj)`` tuples in the same order. Content types
+    come from the ContentType manager cache and objects are fetched with one
+    ``pk__in`` query per model. Either member of a tuple is ``None`` when it
+    could not be resolved.
+    """
+    resolved = []
+    grouped = {}
+    for content_type_id, object_id in pairs:
+        content_type = pk = None
+        try:
+            content_type = ContentType.objects.get_for_id(int(content_type_id))
+            model = content_type.model_class()
+            if model is not None:
+                pk = model._meta.pk.to_python(object_id)
+        except (ValueError, TypeError, ValidationError, ContentType.DoesNotExist):
+            pass
+        if pk is not None:
+            grouped.setdefault(content_type, set()).add(pk)
+        resolved.append((content_type, pk))
+
+    objects = {}
+    for content_type, pks in grouped.items():
+        manager = content_type.model_class()._base_manager.using(content_type._state.db)
+        for obj in manager.filter(pk__in=pks):
+            objects[(content_type.id, obj.pk)] = obj
+
+    return [
+        (content_type, objects.get((content_type.id, pk)) if content_type else None)
+        for content_type, pk in resolved
+    ]
 
 
 def get_avail_models(request):
     """ Returns (model, perm,) for all models user can possibly see """
     items = []
-
-    for model, model_admin in admin.site._registry.items():
-        perms = model_admin.get_model_perms(request)
+    snapshot = get_permission_snapshot(request)
+    for model in admin.site._registry:
+        perms = snapshot.get_model_perms(model)
         if True not in perms.values():
             continue
         items.append((model, perms,))
     return items
 
 
-def filter_models(request, models, exclude):
+def compile_patterns(patterns):
     """
-    Returns (model, perm,) for all models that match models/exclude patterns
-    and are visible by current user.
+    Compiles a list of fnmatch patterns into a single regular expression.
+    The name of the group that matched (``p0``, ``p1``...) is the index of
+    the first pattern matching the string.
     """
-    items = get_avail_models(request)
-    included = []
-    full_name = lambda model: '%s.%s' % (model.__module__, model.__name__)
+    regexes = []
+    for i, pattern in enumerate(patterns):
+        regex = translate(pattern)
+        if regex.endswith('\\Z(?ms)'):
+            # python 2 appends the flags, which can't be nested in a group
+            regex = regex[:-len('(?ms)')]
+        regexes.append('(?P<p%d>%s)' % (i, regex))
+    return re.compile('|'.join(regexes), re.M | re.S)
+
+
+_matching_models = {}
 
-    # I beleive that that implemented
-    # O(len(patterns)*len(matched_patterns)*len(all_models))
-    # algorythm is fine for model lists because they are small and admin
-    # performance is not a bottleneck. If it is not the case then the code
-    # should be optimized.
 
-    if len(models) == 0:
-        included = items
+def get_matching_models(models, exclude, site=None):
+    """
+    Returns the models registered with ``site`` whose full names match the
+    ``models`` patterns (all models if there are none) and none of the
+    ``exclude`` patterns, ordered by the first pattern they match. Results
+    are memoized per patterns and registry.
+    """
+    site = site or admin.site
+    key = (id(site), tuple(models), tuple(exclude), frozenset(site._registry))
+    try:
+        return _matching_models[key]
+    except KeyError:
+        pass
+
+    full_name = lambda model: '%s.%s' % (model.__module__, model.__name__)
+    registered = list(site._registry)
+    if models:
+        include_re = compile_patterns(models)
+        matches = []
+        for position, model in enumerate(registered):
+            match = include_re.match(full_name(model))
+            if match:
+                matches.append((int(match.lastgroup[1:]), position, model))
+        matching = [model for index, position, model in sorted(matches)]
     else:
-        for pattern in models:
-            for item in items:
-                model, perms = item
-                if fnmatch(full_name(model), pattern) and item not in included:
-                    included.append(item)
-
-    result = included[:]
-    for pattern in exclude:
-        for item in included:
-            model, perms = item
-            if fnmatch(full_name(model), pattern):
-                result.remove(item)
-    return result
+        matching = registered
+    if exclude:
+        exclude_re = compile_patterns(exclude)
+        matching = [model for model in matching if not exclude_re.match(full_name(model))]
+
+    _matching_models[key] = matching
+    return matching
+
+
+def filter_models(request, models, exclude):
+    """
+    Returns (model, perm,) for all models that match models/exclude patterns
+    and are visible by current user.
+    """
+    items = []
+    snapshot = get_permission_snapshot(request)
+    for model in get_matching_models(models, exclude):
+        perms = snapshot.get_model_perms(model)
+        if True not in perms.values():
+            continue
+        items.append((model, perms,))
+    return items
 
 
 class AppListElementMixin(object):
@@ -19,13 +19,14 @@ try:
 except ImportError:
     import simplejson as json
 
+from django.conf import settings
 from django.contrib import admin
-from django.contrib.admin.widgets import url_params_from_lookup_dict
 from django.contrib.auth.decorators import login_required
-from django.contrib.contenttypes.models import ContentType
-from django.http import HttpResponse, HttpResponseNotAllowed, HttpResponseRedirect
+from django.core.urlresolvers import reverse
+from django.http import Http404, HttpResponse, HttpResponseNotAllowed, HttpResponseNotModified, HttpResponseRedirect
 from django.shortcuts import get_object_or_404
 from django.template.response import TemplateResponse
+from django.utils.cache import patch_cache_control
 from django.utils.translation import ugettext as _
 from django.utils.safestring import mark_safe
 from django.utils.text import capfirst
@@ -35,50 +36,63 @@ try:
 except ImportError:
     from django.contrib.csrf.middleware import csrf_exempt
 
+from contenttypes import content_type_serializer, generic_rel_registry
+from dashboards import get_dashboard
 from forms import DashboardPreferencesForm, BookmarkForm
 from models import DashboardPreferences, Bookmark
+from permissions import get_permission_snapshot
+from utils import get_generic_objects
 
 
 # Decorator
-def admin_login_required(view_func):
+def admin_login_required(view_func=None, cacheable=False):
+    if view_func is None:
+        return lambda view_func: admin_login_required(view_func, cacheable=cacheable)
 
     @wraps(view_func)
     def _checklogin(request, *args, **kwargs):
         from django.contrib import admin
-        return admin.site.admin_view(view_func)(request, *args, **kwargs)
+        return admin.site.admin_view(view_func, cacheable=cacheable)(request, *args, **kwargs)
     return _checklogin
 
 
-def get_obj(content_type_id, object_id):
-    obj_dict = {
-        'content_type_id': content_type_id,
-        'object_id': object_id,
-    }
-
-    content_type = ContentType.objects.get(pk=content_type_id)
-
-    obj_dict["content_type_text"] = unicode(content_type)
+def get_objs(pairs):
+    """
+    Returns the lookup dicts for a list of ``(content_type_id, object_id)``
+    pairs, resolving all of them with one query per model.
+    """
+    objects = []
+    for (content_type_id, object_id), (content_type, obj) in zip(pairs, get_generic_objects(pairs)):
+        obj_dict = {
+            'content_type_id': content_type_id,
+            'object_id': object_id,
+            'content_type_text': unicode(content_type) if content_type else u'',
+            'object_text': u'',
+        }
+        if obj is not None:
+            obj_dict["object_text"] = unicode(obj)
+            try:
+                obj_dict["object_url"] = obj.get_absolute_url()
+            except AttributeError:
+                obj_dict["object_url"] = ""
+        objects.append(obj_dict)
+    return objects
 
-    try:
-        obj = content_type.get_object_for_this_type(pk=object_id)
-        obj_dict["object_text"] = unicode(obj)
-        try:
-            obj_dict["object_url"] = obj.get_absolute_url()
-        except AttributeError:
-            obj_dict["object_url"] = ""
-    except:
-        obj_dict["object_text"] = ""
 
-    return obj_dict
+def get_obj(content_type_id, object_id):
+    return get_objs([(content_type_id, object_id)])[0]
 
 
 @admin_login_required
 def generic_lookup(request):
+    """
+    Looks up one or more generic objects. Pairs are passed as repeated
+    ``content_type`` and ``object_id`` parameters and are returned in the
+    same order.
+    """
     if request.method == 'GET':
-        objects = []
-        if 'content_type' in request.GET and 'object_id' in request.GET:
-            obj = get_obj(request.GET['content_type'], request.GET['object_id'])
-            objects.append(obj)
+        pairs = zip(request.GET.getlist('content_type'), request.GET.getlist('object_id'))
+        objects = get_objs(pairs)
 
         response = HttpResponse(mimetype='application/json')
         json.dump(objects, response, ensure_ascii=False)
@@ -87,33 +101,66 @@ def generic_lookup(request):
         return HttpResponseNotAllowed(['GET'])
 
 
-@admin_login_required
-def get_generic_rel_list(request, blacklist=(), whitelist=(), url_params={}):
+@admin_login_required(cacheable=True)
+def get_generic_rel_list(request, blacklist=(), whitelist=(), url_params={}, registry_key=None):
+    """
+    Returns the content types that can be picked by the generic relation
+    widget. The mapping is built once per admin configuration and served with
+    an ETag, so browsers only download it again after content types change.
+    """
     if request.method == 'GET':
-        obj_dict = {}
-        for c in ContentType.objects.all().order_by('id'):
-            val = u'%s/%s' % (c.app_label, c.model)
-
-            params = url_params.get('%s.%s' % (c.app_label, c.model), {})
-            params = url_params_from_lookup_dict(params)
-            if 'whitelist' in request.GET:
-                whitelist = request.GET['whitelist']
-            if 'blacklist' in request.GET:
-                blacklist = request.GET['blacklist']
-            if whitelist:
-                if val in whitelist:
-                    obj_dict[c.id] = (val, params)
-            else:
-                if val not in blacklist:
-                    obj_dict[c.id] = (val, params)
-
-        response = HttpResponse(mimetype='application/json')
-        json.dump(obj_dict, response, ensure_ascii=False)
+        if 'whitelist' in request.GET:
+            whitelist = request.GET['whitelist']
+        if 'blacklist' in request.GET:
+            blacklist = request.GET['blacklist']
+        content, etag = generic_rel_registry.get_payload(registry_key, whitelist, blacklist, url_params)
+        etag = '"%s"' % etag
+
+        if request.META.get('HTTP_IF_NONE_MATCH') == etag:
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(content, mimetype='application/json')
+        response['ETag'] = etag
+        patch_cache_control(response, private=True,
+                            max_age=getattr(settings, 'CLIENT_ADMIN_GENERIC_REL_LIST_MAX_AGE', 300))
         return response
     else:
         return HttpResponseNotAllowed(['GET'])
 
 
+@admin_login_required(cacheable=True)
+def content_types_js(request):
+    """
+    Serves the serialized content types as a script assigning
+    ``MODEL_URL_ARRAY``. Templates reference it through a versioned URL, so
+    the response can be cached by the browser for a long time.
+    """
+    format = request.GET.get('format', 'objects')
+    try:
+        content, etag = content_type_serializer.as_script(format)
+    except ValueError:
+        raise Http404
+    etag = '"%s"' % etag
+
+    if request.META.get('HTTP_IF_NONE_MATCH') == etag:
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(content, mimetype='application/javascript')
+    response['ETag'] = etag
+    patch_cache_control(response, private=True,
+                        max_age=getattr(settings, 'CLIENT_ADMIN_CONTENT_TYPES_MAX_AGE', 60 * 60 * 24 * 30))
+    return response
+
+
+def get_content_types_url(format='objects'):
+    """
+    Returns the URL of ``content_types_js`` for the given format, versioned
+    with the current payload so that a change busts browser caches.
+    """
+    etag = content_type_serializer.as_script(format)[1]
+    return '%s?format=%s&v=%s' % (reverse('client_admin_content_types_js'), format, etag[:12])
+
+
 @admin_login_required
 def dashboard(request):
     """
@@ -123,13 +170,13 @@ def dashboard(request):
     """
     context = {}
     app_dict = {}
-    user = request.user
-    for model, model_admin in admin.site._registry.items():
+    snapshot = get_permission_snapshot(request)
+    for model in admin.site._registry:
         app_label = model._meta.app_label
-        has_module_perms = user.has_module_perms(app_label)
+        has_module_perms = snapshot.has_module_perms(app_label)
 
         if has_module_perms:
-            perms = model_admin.get_model_perms(request)
+            perms = snapshot.get_model_perms(model)
 
             # Check whether user has any perm for this module.
             # If so, add the module to the model_list.
@@ -163,6 +210,35 @@ def dashboard(request):
     return TemplateResponse(request, 'client_admin/dashboard/dashboard.html', context=context)
 
 
+@admin_login_required
+def dashboard_module(request, dashboard_id, module_id):
+    """
+    Renders a single dashboard module. Used by the dashboard to load deferred,
+    disabled and collapsed modules once they are needed.
+    """
+    dashboard = get_dashboard()
+    if dashboard.get_id() != dashboard_id:
+        raise Http404
+    context = {'request': request}
+    dashboard.init_with_context(context)
+    dashboard._prepare_children()
+    for module in dashboard.children:
+        if module.id == module_id:
+            break
+    else:
+        raise Http404
+    before = request.GET.get('before')
+    if before and hasattr(module, 'before'):
+        # later pages of paginated modules are not cached
+        module.before = before
+        module.init_with_context(context)
+    else:
+        dashboard.init_module_with_context(module, context)
+    return TemplateResponse(request, module.template, context={
+        'module': module,
+    })
+
+
 @login_required
 @csrf_exempt
 def set_preferences(request, dashboard_id):
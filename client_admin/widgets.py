@@ -16,7 +16,7 @@ from django import forms
 from django.contrib.admin.templatetags.admin_static import static
 from django.contrib.admin.widgets import AdminFileWidget, ForeignKeyRawIdWidget
 from django.conf import settings
-from django.core.urlresolvers import reverse
+from django.core.exceptions import ValidationError
 from django.forms.util import flatatt
 from django.utils.safestring import mark_safe
 from django.utils.encoding import force_text
@@ -24,6 +24,7 @@ from django.utils.html import escape, format_html, format_html_join, smart_urlqu
 from django.utils.text import Truncator
 from django.utils.translation import ugettext as _
 
+from client_admin.adminurls import get_admin_urls
 from client_admin.templatetags.generic import get_admin_object_change_url
 
 
@@ -113,17 +114,84 @@ class AdminURLFieldWidget(forms.TextInput):
         return html
 
 
+class RawIdLabelCollector(object):
+    """
+    Collects the values displayed by ``UnicodeForeignKeyRawIdWidget``s so that
+    the objects they point to are fetched with one query per related model,
+    however many widgets display them.
+    """
+
+    def __init__(self):
+        self._pending = {}
+        self._objects = {}
+
+    def _group(self, rel, db):
+        return (rel.to, db, rel.get_related_field().name)
+
+    def _to_python(self, rel, value):
+        if value in (None, ''):
+            return None
+        try:
+            return rel.get_related_field().to_python(value)
+        except (ValueError, TypeError, ValidationError):
+            return None
+
+    def register(self, rel, db, value):
+        value = self._to_python(rel, value)
+        if value is None:
+            return
+        group = self._group(rel, db)
+        if value not in self._objects.get(group, {}):
+            self._pending.setdefault(group, set()).add(value)
+
+    def get(self, rel, db, value):
+        """
+        Returns the object ``value`` points to, or None. Fetches every value
+        registered for the same related model that hasn't been fetched yet.
+        """
+        value = self._to_python(rel, value)
+        if value is None:
+            return None
+        group = self._group(rel, db)
+        objects = self._objects.setdefault(group, {})
+        if value not in objects:
+            model, db, key = group
+            values = self._pending.pop(group, set()) | set([value])
+            for obj in model._default_manager.using(db).filter(**{'%s__in' % key: values}):
+                objects[getattr(obj, key)] = obj
+            for missing in values:
+                objects.setdefault(missing, None)
+        return objects[value]
+
+
+def get_label_collector(request):
+    """
+    Returns the raw id label collector of ``request``, creating it on first use.
+    """
+    try:
+        return request._client_admin_raw_id_labels
+    except AttributeError:
+        request._client_admin_raw_id_labels = RawIdLabelCollector()
+        return request._client_admin_raw_id_labels
+
+
 class UnicodeForeignKeyRawIdWidget(ForeignKeyRawIdWidget):
     """
     A Widget for displaying ForeignKeys in the "raw_id" interface rather than
     in a <select> box, but displaying the unicode of the object instead of the id.
+    Objects are looked up through a ``RawIdLabelCollector``, usually the one
+    of the current request, so values registered beforehand are fetched in bulk.
     """
-    def __init__(self, rel, admin_site, attrs=None, using=None):
+    def __init__(self, rel, admin_site, attrs=None, using=None, collector=None):
         self.rel = rel
         self.admin_site = admin_site
         self.db = using
+        self.collector = collector or RawIdLabelCollector()
         super(ForeignKeyRawIdWidget, self).__init__(attrs)
 
+    def register_value(self, value):
+        self.collector.register(self.rel, self.db, value)
+
     def render(self, name, value, attrs=None):
         rel_to = self.rel.to
         if attrs is None:
@@ -131,10 +199,7 @@ class UnicodeForeignKeyRawIdWidget(ForeignKeyRawIdWidget):
         extra = []
         if rel_to in self.admin_site._registry:
             # The related object is registered with the same AdminSite
-            related_url = reverse('admin:%s_%s_changelist' %
-                                    (rel_to._meta.app_label,
-                                    rel_to._meta.model_name),
-                                    current_app=self.admin_site.name)
+            related_url = get_admin_urls(self.admin_site).changelist(rel_to)
 
             params = self.url_parameters()
             if params:
@@ -151,9 +216,7 @@ class UnicodeForeignKeyRawIdWidget(ForeignKeyRawIdWidget):
         return mark_safe(''.join(output))
 
     def label_for_value(self, value, name):
-        key = self.rel.get_related_field().name
-        try:
-            obj = self.rel.to._default_manager.using(self.db).get(**{key: value})
+        obj = self.collector.get(self.rel, self.db, value)
+        if obj is not None:
             return '<a href="%s" target="_blank" class="related_link" id="unicode_id_%s">%s</a>' % (get_admin_object_change_url(obj), name, escape(Truncator(obj).words(14, truncate='...')))
-        except (ValueError, self.rel.to.DoesNotExist):
-            return '<a target="_blank" id="unicode_id_%s"></a>' % name
+        return '<a target="_blank" id="unicode_id_%s"></a>' % name